@@ -3,6 +3,10 @@ Act interface
 '''
 import math
 from ..sense import sense as s
+from ..world.grid import get_grid
+from ..events.events import DEBUG, get_log
+
+MOVE_COST = 1.0 / 2.0       # battery (%) used by move_to : -1% / 2 sec -> 1 sec / case
 
 class Action:
     '''
@@ -11,45 +15,49 @@ class Action:
 
     Methods to perform actions based on the plan (e.g., move forward, turn).
     Attributes for different types of actuators (e.g., motors, servos).
+
+    Instructions are dispatched through a command table : ("name", *args) calls commands["name"](*args),
+    new actuators are plugged in with register(name, handler) without touching execute
     '''
 
-    def __init__(self, robot, environment):
+    COMMANDS = ("move_forward", "turn_left", "turn_right", "move_to", "recharge", "follow_path")   # built-in commands
+
+    def __init__(self, robot, environment, log=None):
         self.robot = robot
         self.environment = environment
+        self.grid = get_grid(environment)   # shared occupancy grid
         self.orientation = 0  # orientation en degrés
         self.left_wheel_speed = 0.0   # vitesse roue gauche [-1, 1]
         self.right_wheel_speed = 0.0  # vitesse roue droite [-1, 1]
+        self.log = get_log(log)       # events.EventLog
+        self.odometry = 0             # cells moved by move_to
+        self.commands = {name: getattr(self, name) for name in self.COMMANDS}
 
     def __repr__(self):
-        pass
+        return f"<Action commands={list(self.commands)} odometry={self.odometry}>"
+
+    def register(self, name, handler):
+        """
+        Add (or replace) a command : handler(*args) is called for the instructions ("name", *args)
+        """
+        self.commands[name] = handler
+        return handler
 
     def execute(self, instructions):
         """
         Read the instruction from the plan 
         """
+        commands = self.commands
         for instr in instructions:
-            action_type = instr[0]
-
-            # durée en secondes
-            duration = instr[1] if len(instr) > 1 else 1.0
-
-            if action_type == "move_forward":
-                self.move_forward(duration)
-            elif action_type == "turn_left":
-                self.turn_left(duration)
-            elif action_type == "turn_right":
-                self.turn_right(duration)
-            elif action_type == "move_to":
-                target = instr[1]
-                self.move_to(target)
-            elif action_type == "recharge":
-                self.recharge(duration)
-            else:
-                print(f"[WARNING] Unknown action : {action_type}")
+            handler = commands.get(instr[0])
+            if handler is None:
+                self.log.warning("action.unknown", "Unknown action : %s", instr[0])
+                continue
+            handler(*instr[1:])         # durée en secondes (1 s by default) / target / path
 
     # Move forward, turn_left, turn_right --> only for v1 not used in final version 
     # Could be called in move_to
-    def move_forward(self, duration, speed=1.0):
+    def move_forward(self, duration=1.0, speed=1.0):
         self.left_wheel_speed = speed
         self.right_wheel_speed = speed
 
@@ -57,30 +65,36 @@ class Action:
         dx = round(math.cos(math.radians(self.orientation)) * speed * duration)
         dy = round(math.sin(math.radians(self.orientation)) * speed * duration)
 
-        self.robot._pos["x"] = max(0, min(self.environment["map_size"][0]-1, self.robot._pos["x"] + dx))
-        self.robot._pos["y"] = max(0, min(self.environment["map_size"][1]-1, self.robot._pos["y"] + dy))
+        self.robot._x = max(0, min(self.grid.width-1, self.robot._x + dx))
+        self.robot._y = max(0, min(self.grid.height-1, self.robot._y + dy))
 
         # consommation batterie
-        self.robot.battery = max(0, self.robot.get_battery() - duration / 2.0)
-        print(f"Avance {duration}s à vitesse {speed} → pos=({self.robot._pos["x"]},{self.robot._pos["y"]}), batterie={self.robot.get_battery():.1f}%")
+        self.robot.set_battery(max(0, self.robot.get_battery() - duration / 2.0))
+        if self.log.level <= DEBUG:
+            self.log.emit(DEBUG, "action.move", "Avance %ss à vitesse %s → pos=(%s,%s), batterie=%.1f%%",
+                          duration, speed, self.robot._x, self.robot._y, self.robot.get_battery())
 
-    def turn_left(self, duration, speed=1.0):
+    def turn_left(self, duration=1.0, speed=1.0):
         self.left_wheel_speed = -speed
         self.right_wheel_speed = speed
         self.orientation = (self.orientation + 90 * duration) % 360
         self.robot.set_battery(max(0, self.robot.get_battery() - duration / 2.0))
-        print(f"Tourne à gauche {duration}s → orientation={self.orientation}°, batterie={self.robot.get_battery():.1f}%")
+        if self.log.level <= DEBUG:
+            self.log.emit(DEBUG, "action.turn", "Tourne à gauche %ss → orientation=%s°, batterie=%.1f%%",
+                          duration, self.orientation, self.robot.get_battery())
 
-    def turn_right(self, duration, speed=1.0):
+    def turn_right(self, duration=1.0, speed=1.0):
         self.left_wheel_speed = speed
         self.right_wheel_speed = -speed
         self.orientation = (self.orientation - 90 * duration) % 360
         self.robot.set_battery(max(0, self.robot.get_battery() - duration / 2.0))
-        print(f"Tourne à gauche {duration}s → orientation={self.orientation}°, batterie={self.robot.get_battery():.1f}%")
+        if self.log.level <= DEBUG:
+            self.log.emit(DEBUG, "action.turn", "Tourne à droite %ss → orientation=%s°, batterie=%.1f%%",
+                          duration, self.orientation, self.robot.get_battery())
 
     def move_to(self, target):
         tx, ty = target
-        x, y = self.robot._pos["x"], self.robot._pos["y"]
+        x, y = self.robot._x, self.robot._y
         # Find if the robot has to turn 
         dx = tx - x
         dy = ty - y
@@ -106,26 +120,47 @@ class Action:
                 self.robot._orientation = desired_orientation
         # Move forward in the actual direction
         if self.robot._orientation == 0:
-            self.robot._pos["x"] += 1
+            self.robot._x += 1
         elif self.robot._orientation == 180:
-            self.robot._pos["x"] -= 1
+            self.robot._x -= 1
         elif self.robot._orientation == 90:
-            self.robot._pos["y"] -= 1
+            self.robot._y -= 1
         elif self.robot._orientation == 270:
-            self.robot._pos["y"] += 1
+            self.robot._y += 1
         # Stay in the grid (but shouldn't be a problem)
-        width, height = self.environment["map_size"]
-        self.robot._pos["x"] = max(0, min(self.robot._pos["x"], width-1))
-        self.robot._pos["y"] = max(0, min(self.robot._pos["y"], height-1))
+        self.robot._x = max(0, min(self.robot._x, self.grid.width-1))
+        self.robot._y = max(0, min(self.robot._y, self.grid.height-1))
 
         # Batterie : -1% / 2 sec → 1sec / case
-        self.robot.set_battery(max(0, self.robot.get_battery() - 1.0 / 2.0))
-        print(f"batterie={self.robot.get_battery():.1f}%")
+        self.robot.set_battery(max(0, self.robot.get_battery() - MOVE_COST))
+        self.odometry += 1
+        if self.log.level <= DEBUG:
+            self.log.emit(DEBUG, "action.move", "batterie=%.1f%%", self.robot.get_battery())
 
-    def recharge(self, duration):
+    def recharge(self, duration=1.0):
         # Recharge 1% / sec
         self.robot.set_battery(min(100, self.robot.get_battery() + 1))
-        print(f"Recharge {duration}s → batterie={self.robot.get_battery():.1f}%")
+        if self.log.level <= DEBUG:
+            self.log.emit(DEBUG, "action.recharge", "Recharge %ss → batterie=%.1f%%", duration, self.robot.get_battery())
+
+    def follow_path(self, path, min_battery=0.0):
+        """
+        Macro : move_to along the cells of a path in one call (Plan marks the cells crossed visited on its next decide)
+        Stops before a cell that is an obstacle or not next to the robot, or when the battery is down to min_battery
+        Returns the number of cells moved
+        """
+        robot, grid = self.robot, self.grid
+        moved = 0
+        for cell in path:
+            cx, cy = cell
+            if abs(cx - robot._x) + abs(cy - robot._y) != 1 or not grid.is_free(cx, cy) or robot.get_battery() <= min_battery:
+                break
+            self.move_to(cell)
+            moved += 1
+        if self.log.level <= DEBUG:
+            self.log.emit(DEBUG, "action.follow", "Chemin suivi : %s/%s cases → pos=(%s,%s), batterie=%.1f%%",
+                          moved, len(path), robot._x, robot._y, robot.get_battery())
+        return moved
 
 if __name__ == "__main__":
     pass
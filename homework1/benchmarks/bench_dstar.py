@@ -0,0 +1,75 @@
+'''
+D* Lite repairs against full A* replans when obstacles appear on the robot's path
+
+The robot walks from one corner to the other. Every few steps an obstacle is put on its path a few cells
+ahead, then the path is repaired by D* Lite and, from the same position, replanned from scratch by A*.
+
+From the directory SPA_model :
+    python -m homework1.benchmarks.bench_dstar --size 200 --every 10
+'''
+import argparse
+import random
+import time
+from ..plan.search import astar
+from ..plan.dstar import DStarLite
+from ..world.grid import Grid
+from .bench_search import make_map
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=200)
+    parser.add_argument("--density", type=float, default=0.1)
+    parser.add_argument("--every", type=int, default=10, help="steps between two new obstacles")
+    parser.add_argument("--ahead", type=int, default=5, help="distance of the new obstacle on the path")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    size = args.size
+    rng = random.Random(args.seed)
+    grid = Grid((size, size), make_map(size, args.density, args.seed))
+    start, goal = (0, 0), (size-1, size-1)
+    dstar = DStarLite(grid)
+
+    t0 = time.perf_counter()
+    path = dstar.route(start, goal)
+    first = (dstar.expanded, time.perf_counter() - t0)
+    stats = {}
+    astar(start, goal, grid, stats)
+    print(f"{size}x{size}, {args.density:.0%} obstacles, first search : "
+          f"D* Lite {first[0]} expansions / A* {stats['expanded']}")
+
+    pos, steps, replans = start, 0, 0
+    repair = {"expanded": 0, "time": 0.0}
+    full = {"expanded": 0, "time": 0.0}
+    while path and pos != goal:
+        pos = path.pop(0)
+        steps += 1
+        if steps % args.every or len(path) <= args.ahead:
+            continue
+        # new obstacle on the path, a few cells ahead (or next to it if several are injected on the same cell)
+        x, y = path[min(args.ahead, len(path)-2) + rng.randint(0, 1)]
+        grid.set_obstacle(x, y)
+        replans += 1
+
+        before = dstar.expanded
+        t0 = time.perf_counter()
+        path = dstar.route(pos, goal)
+        repair["time"] += time.perf_counter() - t0
+        repair["expanded"] += dstar.expanded - before
+
+        stats = {}
+        t0 = time.perf_counter()
+        flat = astar(pos, goal, grid, stats)
+        full["time"] += time.perf_counter() - t0
+        full["expanded"] += stats["expanded"]
+        if (path is None) != (flat is None) or (path and len(path) != len(flat)):
+            raise SystemExit(f"D* Lite and A* disagree at {pos}")
+
+    print(f"{replans} obstacles injected along {steps} steps")
+    print(f"D* Lite repairs : {repair['expanded']:>8} expansions {repair['time']*1000:>9.1f} ms")
+    print(f"A* full replans : {full['expanded']:>8} expansions {full['time']*1000:>9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
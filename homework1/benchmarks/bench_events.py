@@ -0,0 +1,60 @@
+'''
+SPA throughput with the events log off, at the default level, sampled and full (every per-cycle
+event formatted and written to /dev/null, or kept in the memory ring buffer only)
+
+From the directory SPA_model :
+    python -m homework1.benchmarks.bench_events --steps 100000 --sample 100
+'''
+import argparse
+import os
+import random
+import time
+from ..events.events import EventLog, DEBUG, INFO, OFF
+from ..simulation.simulation import Simulation, default_environment
+
+PER_CYCLE = ("plan.exploration", "plan.path", "action.move", "action.recharge")
+
+
+def run(steps, seed, log):
+    """
+    Cycles per second (a new simulation is started when the battery gets empty), the log is flushed at the end
+    """
+    random.seed(seed)
+    done = 0
+    t0 = time.perf_counter()
+    while done < steps:
+        n = Simulation(default_environment(), log=log).step(steps - done)
+        done += n
+        if n == 0:
+            break
+    log.flush()
+    return done/(time.perf_counter() - t0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--steps", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--sample", type=int, default=100, help="keep 1 per-cycle event out of n (sampled run)")
+    parser.add_argument("--format", default="text", choices=("text", "json"))
+    args = parser.parse_args()
+
+    with open(os.devnull, "w") as devnull:
+        sampled = EventLog(level=DEBUG, sink=devnull, fmt=args.format)
+        sampled.sample.update({name: args.sample for name in PER_CYCLE})
+        logs = [
+            ("off", EventLog(level=OFF)),
+            ("info (default level)", EventLog(level=INFO, sink=devnull, fmt=args.format)),
+            (f"debug, sampled 1/{args.sample}", sampled),
+            ("debug, full -> /dev/null", EventLog(level=DEBUG, sink=devnull, fmt=args.format)),
+            ("debug, full, ring buffer only", EventLog(level=DEBUG, sink=None)),
+        ]
+        base = None
+        for name, log in logs:
+            rate = run(args.steps, args.seed, log)
+            base = base or rate
+            print(f"{name:<32} {rate:>10,.0f} cycles/s ({rate/base:6.1%})  events {log.emitted:,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+'''
+Greedy exploration (find_next_cell) against frontier-based exploration
+Steps and battery spent by the full Sense -> Plan -> Act loop to reach a coverage target on seeded maps
+
+From the directory SPA_model :
+    python -m homework1.benchmarks.bench_explore --size 20 --maps 10 --target 80
+'''
+import argparse
+import random
+from ..robot import robot as r
+from ..sense import sense as s
+from ..plan import plan as p
+from ..action import action as a
+from ..events.events import EventLog, OFF
+from ..simulation.montecarlo import random_environment
+
+
+def make_environment(size, density, seed):
+    """
+    Seeded map of montecarlo.random_environment : the recharge zone is free and reachable from the start cell (0, 0)
+    """
+    return random_environment(size, density, random.Random(seed))
+
+
+def run(environment, explorer, target, max_steps, seed):
+    """
+    Returns (steps, battery spent) to reach the coverage target, steps is None if it was not reached
+    """
+    random.seed(seed)
+    robot = r.Robot("Bench")
+    sense = s.Sense(robot, environment)
+    log = EventLog(level=OFF)
+    planner = p.Plan(robot, environment, explorer=explorer, log=log)
+    actuator = a.Action(robot, environment, log=log)
+    grid = planner._grid
+    spent = 0.0
+    for step in range(1, max_steps+1):
+        before = robot.get_battery()
+        actuator.execute(planner.decide(sense.perceive()))
+        spent += max(0.0, before - robot.get_battery())
+        if grid.exploration_rate() >= target:
+            return step, spent
+        if robot.get_battery() <= 0:
+            break
+    return None, spent
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=20)
+    parser.add_argument("--density", type=float, default=0.15)
+    parser.add_argument("--maps", type=int, default=10)
+    parser.add_argument("--target", type=float, default=80.0, help="coverage target in %%")
+    parser.add_argument("--max-steps", type=int, default=20000)
+    args = parser.parse_args()
+
+    print(f"{args.size}x{args.size}, {args.density:.0%} obstacles, coverage target {args.target}%")
+    print(f"{'seed':>5} {'greedy steps':>13} {'battery':>8} {'frontier steps':>15} {'battery':>8}")
+    totals = {"greedy": [0, 0.0, 0], "frontier": [0, 0.0, 0]}
+    for seed in range(args.maps):
+        row = []
+        for explorer in ("greedy", "frontier"):
+            environment = make_environment(args.size, args.density, seed)
+            steps, spent = run(environment, explorer, args.target, args.max_steps, seed)
+            row += [str(steps) if steps is not None else "-", f"{spent:.1f}"]
+            if steps is not None:
+                totals[explorer][0] += steps
+                totals[explorer][1] += spent
+                totals[explorer][2] += 1
+        print(f"{seed:>5} {row[0]:>13} {row[1]:>8} {row[2]:>15} {row[3]:>8}")
+    for explorer, (steps, spent, reached) in totals.items():
+        if reached:
+            print(f"{explorer:>9} : target reached on {reached}/{args.maps} maps, "
+                  f"mean {steps/reached:.0f} steps, {spent/reached:.1f}% battery")
+        else:
+            print(f"{explorer:>9} : target never reached")
+
+
+if __name__ == "__main__":
+    main()
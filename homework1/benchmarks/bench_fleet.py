@@ -0,0 +1,99 @@
+'''
+Planning time of a fleet per tick : one Plan.decide per robot against one FleetPlan.decide_arrays call
+Robots start on random free cells, lidars are read from the grid and moves are applied directly
+(the time measured is the planning only)
+
+From the directory SPA_model :
+    python -m homework1.benchmarks.bench_fleet --size 200 --robots 1000 --ticks 100
+'''
+import argparse
+import time
+import numpy as np
+from ..robot import robot as r
+from ..plan import plan as p
+from ..plan.fleet import FleetPlan
+from ..simulation.fleet import lidars
+from ..action.action import MOVE_COST
+from ..events.events import EventLog, OFF
+from .bench_explore import make_environment
+
+
+def start_state(grid, n, seed):
+    rng = np.random.default_rng(seed)
+    free = np.flatnonzero(grid.occupancy.reshape(-1) == 0)
+    idx = rng.choice(free, size=n)
+    x, y = idx % grid.width, idx // grid.width
+    return x, y, rng.choice([0, 90, 180, 270], size=n), rng.uniform(30, 100, size=n)
+
+
+def run_fleet(environment, n, ticks, seed):
+    """
+    Returns (first tick, mean tick) in ms
+    """
+    fleet = FleetPlan(None, environment, size=n, seed=seed)
+    grid = fleet._grid
+    x, y, orientation, battery = start_state(grid, n, seed)
+    times = []
+    for _ in range(ticks):
+        front, left, right = lidars(grid, x, y, orientation)
+        t0 = time.perf_counter()
+        charge, tx, ty, amount, orientation = fleet.decide_arrays(x, y, orientation, battery, front, left, right)
+        times.append(time.perf_counter() - t0)
+        x, y = np.where(charge, x, tx), np.where(charge, y, ty)
+        battery = np.where(charge, np.minimum(100, battery + 1), np.maximum(0, battery - MOVE_COST))
+    return times[0]*1000, sum(times[1:])/max(len(times)-1, 1)*1000
+
+
+def run_scalar(environment, n, ticks, seed):
+    """
+    Same loop with one Plan per robot, returns the mean tick in ms (first tick excluded, like run_fleet)
+    """
+    robots = [r.Robot(f"R{k}") for k in range(n)]
+    log = EventLog(level=OFF)
+    planners = [p.Plan(robot, environment, search="astar", log=log) for robot in robots]
+    grid = planners[0]._grid
+    x, y, orientation, battery = start_state(grid, n, seed)
+    for robot, o in zip(robots, orientation.tolist()):
+        robot._orientation = o
+    times = []
+    for _ in range(ticks):
+        orientation = np.array([robot._orientation for robot in robots])
+        front, left, right = lidars(grid, x, y, orientation)
+        t0 = time.perf_counter()
+        decisions = [planner.decide({"battery": b, "position": (px, py), "obstacle_ahead": f == 0.0,
+                                     "lidar_front": f, "lidar_left": le, "lidar_right": ri})
+                     for planner, px, py, b, f, le, ri in zip(planners, x.tolist(), y.tolist(), battery.tolist(),
+                                                              front.tolist(), left.tolist(), right.tolist())]
+        times.append(time.perf_counter() - t0)
+        for k, decision in enumerate(decisions):
+            kind, value = decision[0]
+            if kind == "move_to":
+                x[k], y[k] = value
+                battery[k] = max(0, battery[k] - MOVE_COST)
+            else:
+                battery[k] = min(100, battery[k] + 1)
+    return sum(times[1:])/max(len(times)-1, 1)*1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=200)
+    parser.add_argument("--density", type=float, default=0.1)
+    parser.add_argument("--robots", type=int, default=1000)
+    parser.add_argument("--ticks", type=int, default=100)
+    parser.add_argument("--scalar-ticks", type=int, default=5, help="ticks of the per-robot Plan loop")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    environment = make_environment(args.size, args.density, args.seed)
+    print(f"{args.size}x{args.size}, {args.density:.0%} obstacles, {args.robots} robots")
+    first, mean = run_fleet(environment, args.robots, args.ticks, args.seed)
+    print(f"FleetPlan.decide_arrays : first tick {first:.1f} ms (distance fields), then {mean:.2f} ms / tick")
+    if args.scalar_ticks:
+        environment = make_environment(args.size, args.density, args.seed)
+        scalar = run_scalar(environment, args.robots, args.scalar_ticks, args.seed)
+        print(f"Plan.decide x {args.robots}   : {scalar:.2f} ms / tick ({scalar/mean:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+'''
+Ticks per second of the vectorized FleetSimulation (perceive + FleetPlan + move_to / recharge on arrays)
+--check : the same fleet is also run through one Sense and one Action per robot (scalar classes),
+fed with the same decisions, and the lidars, positions, orientations and batteries are compared every tick
+
+From the directory SPA_model :
+    python -m homework1.benchmarks.bench_fleet_sim --size 200 --robots 10000 --ticks 200
+    python -m homework1.benchmarks.bench_fleet_sim --size 30 --robots 200 --ticks 500 --check
+'''
+import argparse
+import time
+import numpy as np
+from ..robot import robot as r
+from ..sense import sense as s
+from ..action import action as a
+from ..world.grid import get_grid
+from ..events.events import EventLog, OFF
+from ..simulation.fleet import FleetSimulation
+from .bench_explore import make_environment
+
+
+def start_positions(grid, n, seed):
+    rng = np.random.default_rng(seed)
+    idx = rng.choice(np.flatnonzero(grid.occupancy.reshape(-1) == 0), size=n)
+    return list(zip((idx % grid.width).tolist(), (idx // grid.width).tolist()))
+
+
+def run(environment, n, ticks, seed):
+    """
+    Returns (ticks done, mean tick in ms, robots alive)
+    """
+    fleet = FleetSimulation(n, environment, seed=seed)
+    fleet.x, fleet.y = (np.array(c) for c in zip(*start_positions(fleet.grid, n, seed)))
+    fleet.step()                                    # first tick : distance fields
+    t0 = time.perf_counter()
+    done = fleet.step(ticks)
+    elapsed = time.perf_counter() - t0
+    return done, elapsed/max(done, 1)*1000, int(fleet.alive().sum())
+
+
+def check(environment, n, ticks, seed):
+    """
+    Number of mismatches between FleetSimulation and the scalar Sense / Action classes
+    """
+    fleet = FleetSimulation(n, environment, seed=seed, positions=start_positions(get_grid(environment), n, seed))
+    robots = [r.Robot(f"R{k}") for k in range(n)]
+    senses = [s.Sense(robot, environment) for robot in robots]
+    log = EventLog(level=OFF)
+    actuators = [a.Action(robot, environment, log=log) for robot in robots]
+    for robot, x, y in zip(robots, fleet.x.tolist(), fleet.y.tolist()):
+        robot.set_pos(x, y)
+    mismatches = 0
+    for _ in range(ticks):
+        alive = fleet.alive()
+        front, left, right = fleet.perceive()
+        for k, sense in enumerate(senses):
+            perception = sense.perceive()
+            if (perception["lidar_front"], perception["lidar_left"], perception["lidar_right"]) != (front[k], left[k], right[k]):
+                mismatches += 1
+        charge, tx, ty, amount, orientation = fleet.planner.decide_arrays(
+            fleet.x, fleet.y, fleet.orientation, fleet.battery, front, left, right)
+        fleet.orientation = np.where(alive, orientation, fleet.orientation)
+        fleet.act(charge, tx, ty, alive)
+        for k, (robot, actuator) in enumerate(zip(robots, actuators)):
+            if robot.get_battery() <= 0:
+                continue
+            robot._orientation = int(orientation[k])
+            actuator.execute([("recharge", amount[k])] if charge[k] else [("move_to", (int(tx[k]), int(ty[k])))])
+            state = robot.get_pos() + (robot._orientation, robot.get_battery())
+            if state != (fleet.x[k], fleet.y[k], fleet.orientation[k], fleet.battery[k]):
+                mismatches += 1
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=200)
+    parser.add_argument("--density", type=float, default=0.1)
+    parser.add_argument("--robots", type=int, default=10000)
+    parser.add_argument("--ticks", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--check", action="store_true", help="compare with the scalar Sense / Action classes")
+    args = parser.parse_args()
+
+    environment = make_environment(args.size, args.density, args.seed)
+    print(f"{args.size}x{args.size}, {args.density:.0%} obstacles, {args.robots} robots")
+    if args.check:
+        mismatches = check(environment, args.robots, args.ticks, args.seed)
+        print(f"{args.ticks} ticks compared with Sense / Action : {mismatches} mismatches")
+        return
+    done, tick, alive = run(environment, args.robots, args.ticks, args.seed)
+    print(f"{done} ticks : {tick:.2f} ms / tick ({1000/tick:.0f} ticks/s), {alive} robots alive")
+
+
+if __name__ == "__main__":
+    main()
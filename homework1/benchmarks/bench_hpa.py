@@ -0,0 +1,95 @@
+'''
+Query latency of the hierarchical planner (HPA*) against flat A* on very large maps
+
+From the directory SPA_model :
+    python -m homework1.benchmarks.bench_hpa --size 10000 --queries 3
+(the 10k x 10k grid takes ~300 MB, flat A* needs several seconds per query at this size)
+'''
+import argparse
+import random
+import time
+import numpy as np
+from ..plan.search import astar
+from ..plan.hpa import HierarchicalPlanner
+from ..world.grid import Grid
+
+
+def random_occupancy(size, density, seed, chunk=1000):
+    """
+    Random obstacles generated by blocks of rows (no size x size float array in memory)
+    """
+    rng = np.random.default_rng(seed)
+    occupancy = np.empty((size, size), dtype=np.uint8)
+    for y in range(0, size, chunk):
+        occupancy[y:y+chunk] = rng.random((min(chunk, size - y), size), dtype=np.float32) < density
+    return occupancy
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=2000)
+    parser.add_argument("--density", type=float, default=0.1)
+    parser.add_argument("--cluster", type=int, default=32, help="cluster size")
+    parser.add_argument("--queries", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    size = args.size
+    grid = Grid((size, size), occupancy=random_occupancy(size, args.density, args.seed))
+    t0 = time.perf_counter()
+    hpa = HierarchicalPlanner(grid, cluster_size=args.cluster)
+    print(f"{size}x{size}, {args.density:.0%} obstacles : {hpa} built in {time.perf_counter() - t0:.2f} s")
+
+    rng = random.Random(args.seed)
+    queries = []
+    while len(queries) < args.queries:    # far apart pairs (at least half the map)
+        start = (rng.randrange(size//4), rng.randrange(size))
+        goal = (rng.randrange(3*size//4, size), rng.randrange(size))
+        if grid.is_free(*start) and grid.is_free(*goal):
+            queries.append((start, goal))
+
+    print("cold : first query, the intra-cluster distances it needs are computed / warm : same query again")
+    print("tick : mean route() call while following the path (next segment refined)")
+    print(f"{'query':>5} {'A* [ms]':>9} {'HPA cold [ms]':>14} {'warm [ms]':>10} {'tick [ms]':>10} "
+          f"{'A* len':>7} {'HPA len':>8}")
+    for n, (start, goal) in enumerate(queries):
+        t0 = time.perf_counter()
+        flat = astar(start, goal, grid)
+        t_flat = time.perf_counter() - t0
+
+        hpa._abstract = None
+        t0 = time.perf_counter()
+        segment = hpa.route(start, goal)
+        t_cold = time.perf_counter() - t0
+        hpa._abstract = None
+        t0 = time.perf_counter()
+        segment = hpa.route(start, goal)
+        t_warm = time.perf_counter() - t0
+
+        # the robot follows the path : one route() call each time a segment is done
+        calls, t_ticks, length, pos = 0, 0.0, 0, start
+        while segment:
+            length += len(segment)
+            pos = segment[-1]
+            if pos == goal:
+                break
+            t0 = time.perf_counter()
+            segment = hpa.route(pos, goal)
+            t_ticks += time.perf_counter() - t0
+            calls += 1
+        flat_len = len(flat) if flat is not None else "-"
+        hpa_len = length if pos == goal else "-"
+        print(f"{n:>5} {t_flat*1000:>9.1f} {t_cold*1000:>14.1f} {t_warm*1000:>10.1f} {t_ticks/max(calls, 1)*1000:>10.3f} "
+              f"{flat_len:>7} {hpa_len:>8}")
+
+    # obstacle change : only the clusters / borders around the cell are rebuilt
+    start, goal = queries[0]
+    x, y = size//2, size//2
+    grid.set_obstacle(x, y, not grid.is_obstacle(x, y))
+    t0 = time.perf_counter()
+    hpa.route(start, goal)
+    print(f"route after one obstacle change : {(time.perf_counter() - t0)*1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
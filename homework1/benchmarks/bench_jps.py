@@ -0,0 +1,55 @@
+'''
+Jump Point Search against A* and BFS on open maps and on maps with 5-30% obstacles
+Every query checks that the three engines return the same path length
+
+From the directory SPA_model :
+    python -m homework1.benchmarks.bench_jps --size 200 --queries 20
+'''
+import argparse
+import random
+import time
+from ..plan.search import ENGINES
+from ..world.grid import Grid
+from .bench_search import make_map
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=200)
+    parser.add_argument("--densities", type=float, nargs="+", default=[0.0, 0.05, 0.1, 0.2, 0.3])
+    parser.add_argument("--queries", type=int, default=20, help="random start/goal pairs per map")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{args.size}x{args.size}, {args.queries} queries per map (mean per query)")
+    print(f"{'density':>8} {'engine':>7} {'expanded':>10} {'wall [ms]':>10}")
+    for density in args.densities:
+        size = args.size
+        grid = Grid((size, size), make_map(size, density, args.seed))
+        rng = random.Random(args.seed)
+        queries = []
+        while len(queries) < args.queries:
+            start = (rng.randrange(size), rng.randrange(size))
+            goal = (rng.randrange(size), rng.randrange(size))
+            if grid.is_free(*start) and grid.is_free(*goal):
+                queries.append((start, goal))
+
+        lengths = {}
+        for name, engine in ENGINES.items():
+            expanded = 0
+            wall = 0.0
+            for start, goal in queries:
+                stats = {}
+                t0 = time.perf_counter()
+                path = engine(start, goal, grid, stats)
+                wall += time.perf_counter() - t0
+                expanded += stats["expanded"]
+                lengths.setdefault((start, goal), set()).add(None if path is None else len(path))
+            print(f"{density:>8.2f} {name:>7} {expanded/len(queries):>10.0f} {wall/len(queries)*1000:>10.2f}")
+        mismatch = [q for q, l in lengths.items() if len(l) > 1]
+        if mismatch:
+            raise SystemExit(f"path lengths differ for {mismatch}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+'''
+Lidar readings : grid cells around the robot (branches on the orientation + 3 is_free) against the
+precomputed LidarTable (one indexed read), alone and inside Sense.perceive
+Also checks that both give the same values, before and after obstacle changes
+
+From the directory SPA_model :
+    python -m homework1.benchmarks.bench_lidar --size 200 --reads 200000
+'''
+import argparse
+import random
+import time
+from ..robot import robot as r
+from ..sense import sense as s
+from .bench_explore import make_environment
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=200)
+    parser.add_argument("--density", type=float, default=0.2)
+    parser.add_argument("--reads", type=int, default=200000)
+    parser.add_argument("--changes", type=int, default=100, help="obstacles toggled before the second check")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    environment = make_environment(args.size, args.density, 0)
+    robot = r.Robot("Bench")
+    grid_sense = s.Sense(robot, environment)
+    t0 = time.perf_counter()
+    table_sense = s.Sense(robot, environment, lidar="table")
+    build = time.perf_counter() - t0
+    table = table_sense._lidar_table
+    print(f"{args.size}x{args.size}, {args.density:.0%} obstacles : table built in {build*1000:.1f} ms, "
+          f"{table.table.nbytes/1024:.0f} kB")
+
+    states = [(rng.randrange(args.size), rng.randrange(args.size), rng.choice((0, 90, 180, 270)))
+              for _ in range(args.reads)]
+
+    def check():
+        mismatches = 0
+        for x, y, o in states[:20000]:
+            robot._x, robot._y, robot._orientation = x, y, o
+            lidars = grid_sense.read_lidars(x, y, {})
+            if (lidars["front"], lidars["left"], lidars["right"]) != table.read(x, y, o):
+                mismatches += 1
+        return mismatches
+
+    print(f"mismatches : {check()}")
+    grid = grid_sense.grid
+    for _ in range(args.changes):
+        x, y = rng.randrange(args.size), rng.randrange(args.size)
+        grid.set_obstacle(x, y, not grid.is_obstacle(x, y))
+    t0 = time.perf_counter()
+    table.update()
+    print(f"{args.changes} obstacle changes : table patched in {(time.perf_counter() - t0)*1000:.2f} ms, "
+          f"mismatches : {check()}")
+
+    read_lidars, read = grid_sense.read_lidars, table.read
+    t0 = time.perf_counter()
+    for x, y, o in states:
+        robot._orientation = o
+        read_lidars(x, y, {})
+    t_grid = (time.perf_counter() - t0)/len(states)*1e9
+    t0 = time.perf_counter()
+    for x, y, o in states:
+        read(x, y, o)
+    t_table = (time.perf_counter() - t0)/len(states)*1e9
+    print(f"lidars only      : grid {t_grid:.0f} ns, table {t_table:.0f} ns ({t_grid/t_table:.1f}x)")
+
+    for name, sense in (("grid", grid_sense), ("table", table_sense)):
+        t0 = time.perf_counter()
+        for x, y, o in states:
+            robot._x, robot._y, robot._orientation = x, y, o
+            sense.perceive()
+        print(f"perceive ({name:>5}) : {(time.perf_counter() - t0)/len(states)*1e9:.0f} ns")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+'''
+Cells moved per wall second : one move_to per SPA cycle against whole routes sent to Action.follow_path
+(Plan(macro=True) : the way back to the base and the routes to the random goals take one cycle each,
+the exploration is still done cell by cell, frontier explorer by default). The cycles spent charging at the base (+1 % per cycle) are
+the same in both modes, they are counted apart.
+--check : both modes must move the robot through the same cells
+
+From the directory SPA_model :
+    python -m homework1.benchmarks.bench_macro --size 50 --cells 20000 --check
+'''
+import argparse
+import random
+import time
+from ..events.events import EventLog, OFF
+from ..simulation.simulation import Simulation
+from ..simulation.montecarlo import random_environment
+
+
+def run(size, density, seed, cells, macro, explorer, trace=None):
+    """
+    (cells moved, SPA cycles, seconds, charging cycles, seconds charging) once cells cells are moved
+    (or the battery is empty). trace : list receiving every cell reached
+    """
+    environment = random_environment(size, density, random.Random(seed))
+    random.seed(seed)
+    simulation = Simulation(environment, log=EventLog(level=OFF), macro=macro, explorer=explorer)
+    actuator, robot, planner = simulation.actuator, simulation.robot, simulation.planner
+    if trace is not None:
+        move_to = actuator.move_to
+
+        def traced(target):
+            move_to(target)
+            trace.append(robot.get_pos())
+        actuator.move_to = traced                       # follow_path calls self.move_to
+        actuator.register("move_to", traced)
+    charging, charging_time = 0, 0.0
+    now = time.perf_counter
+    start = now()
+    while actuator.odometry < cells and not simulation.done:
+        t0 = now()
+        simulation.step()
+        if planner._instruction[-1] == "charge":
+            charging += 1
+            charging_time += now() - t0
+    return actuator.odometry, simulation.steps, now() - start, charging, charging_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=50)
+    parser.add_argument("--density", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--cells", type=int, default=20000, help="cells to move")
+    parser.add_argument("--explorer", default="frontier", choices=["greedy", "frontier"],
+                        help="the greedy explorer rarely reaches the 80 %% after which the random goals start")
+    parser.add_argument("--check", action="store_true")
+    args = parser.parse_args()
+
+    rates = {}
+    for macro in (False, True):
+        moved, cycles, elapsed, charging, charging_time = run(args.size, args.density, args.seed, args.cells, macro, args.explorer)
+        moving = elapsed - charging_time
+        rates[macro] = (moved/elapsed, moved/moving)
+        print(f"{'follow_path' if macro else 'move_to per cycle':<18} {moved:,} cells in {cycles:,} cycles "
+              f"({charging:,} charging) {elapsed:.2f} s : {moved/elapsed:,.0f} cells/s, "
+              f"{moved/moving:,.0f} cells/s out of the charging cycles ({moved/(cycles - charging):.1f} cells/cycle)")
+    print(f"speed-up x{rates[True][0]/rates[False][0]:.2f} overall, x{rates[True][1]/rates[False][1]:.2f} out of the charging cycles")
+
+    if args.check:
+        traces = {}
+        for macro in (False, True):
+            traces[macro] = []
+            run(args.size, args.density, args.seed, args.cells, macro, args.explorer, traces[macro])
+        n = min(len(traces[False]), len(traces[True]))
+        first = next((k for k in range(n) if traces[False][k] != traces[True][k]), None)
+        print(f"check : {n:,} cells compared, " + ("same path" if first is None else f"first difference at cell {first}"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+'''
+Map loading : ASCII, PNG and .npy files, first load (parsing + binary cache) and second load (memory-mapped cache)
+Reports load time and resident memory growth (RSS) for each format
+
+From the directory SPA_model :
+    python -m homework1.benchmarks.bench_maps --size 4000
+    python -m homework1.benchmarks.bench_maps --size 20000 --formats npy ascii
+'''
+import argparse
+import os
+import tempfile
+import time
+import numpy as np
+from ..world.maps import load_map
+
+
+def rss():
+    """
+    Resident memory in bytes (Linux)
+    """
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1])*os.sysconf("SC_PAGE_SIZE")
+
+
+def write_maps(directory, size, density, formats, seed=0):
+    rng = np.random.default_rng(seed)
+    occupancy = (rng.random((size, size)) < density).astype(np.uint8)
+    occupancy[0, 0] = 0
+    paths = {}
+    if "npy" in formats:
+        paths["npy"] = os.path.join(directory, "map.npy")
+        np.save(paths["npy"], occupancy)
+    if "ascii" in formats:
+        paths["ascii"] = os.path.join(directory, "map.txt")
+        chars = np.where(occupancy == 1, ord("#"), ord(".")).astype(np.uint8)
+        chars[0, 0] = ord("R")
+        with open(paths["ascii"], "wb") as f:
+            for row in chars:
+                f.write(row.tobytes() + b"\n")
+    if "png" in formats:
+        import pygame
+        paths["png"] = os.path.join(directory, "map.png")
+        rgb = np.where(occupancy[:, :, None] == 1, 0, 255).astype(np.uint8).repeat(3, axis=2)
+        rgb[0, 0] = (0, 255, 0)
+        pygame.image.save(pygame.surfarray.make_surface(rgb.transpose(1, 0, 2)), paths["png"])
+    return paths
+
+
+def measure(path):
+    """
+    (seconds, RSS growth) of load_map (free_count is only counted on first use)
+    """
+    before = rss()
+    t0 = time.perf_counter()
+    environment = load_map(path)
+    elapsed = time.perf_counter() - t0
+    growth = rss() - before
+    del environment
+    return elapsed, growth
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=4000)
+    parser.add_argument("--density", type=float, default=0.1)
+    parser.add_argument("--formats", nargs="+", default=["npy", "ascii", "png"], choices=["npy", "ascii", "png"])
+    args = parser.parse_args()
+
+    print(f"{args.size}x{args.size} map, {args.density:.0%} obstacles ({args.size**2/2**20:.0f} MB as uint8)")
+    print(f"{'format':>6} {'file [MB]':>10} {'first [ms]':>11} {'RSS+ [MB]':>10} {'cached [ms]':>12} {'RSS+ [MB]':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, path in write_maps(tmp, args.size, args.density, args.formats).items():
+            first, first_rss = measure(path)
+            second, second_rss = measure(path)
+            print(f"{name:>6} {os.path.getsize(path)/2**20:>10.1f} {first*1000:>11.1f} {first_rss/2**20:>10.1f} "
+                  f"{second*1000:>12.1f} {second_rss/2**20:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+'''
+Planner CPU in the post-exploration phase (random goals) with and without the path memory
+
+From the directory SPA_model :
+    python -m homework1.benchmarks.bench_plan_cache --size 100 --ticks 10000
+'''
+import argparse
+import random
+import time
+from ..robot import robot as r
+from ..plan import plan as p
+from ..world.grid import Grid
+from ..events.events import EventLog, OFF
+from .bench_search import make_map
+
+
+def run(size, density, ticks, seed, path_cache_size):
+    """
+    Exploration already done, battery always full : every tick goes toward the random goal
+    The robot is teleported on the decided cell (no Action, only the planner is measured)
+    """
+    random.seed(seed)
+    obstacles = make_map(size, density, seed)
+    grid = Grid((size, size), obstacles, recharge_zone=(0, 0))
+    grid.visited[grid.occupancy == 0] = 1
+    grid.visited_count = grid.free_count
+    environment = {"map_size": (size, size), "recharge_zone": (0, 0), "obstacles": obstacles, "grid": grid}
+    robot = r.Robot("Bench")
+    planner = p.Plan(robot, environment, return_policy="threshold", log=EventLog(level=OFF))     # never goes back to the base
+    planner.path_cache_size = path_cache_size
+    perception = {"battery": 100.0, "position": (0, 0), "obstacle_ahead": False,
+                  "lidar_front": 1.0, "lidar_left": 1.0, "lidar_right": 1.0}
+    pos = (0, 0)
+    t0 = time.process_time()
+    for _ in range(ticks):
+        perception["position"] = pos
+        decision = planner.decide(perception)
+        pos = decision[0][1]
+    cpu = time.process_time() - t0
+    return cpu
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=100)
+    parser.add_argument("--density", type=float, default=0.1)
+    parser.add_argument("--ticks", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    replan = run(args.size, args.density, args.ticks, args.seed, path_cache_size=0)
+    cached = run(args.size, args.density, args.ticks, args.seed, path_cache_size=64)
+    print(f"{args.size}x{args.size}, {args.ticks} ticks after exploration")
+    print(f"replan every tick : {replan:.3f} s CPU  ({replan/args.ticks*1e6:.1f} us / tick)")
+    print(f"path memory       : {cached:.3f} s CPU  ({cached/args.ticks*1e6:.1f} us / tick, x{replan/cached:.0f})")
+
+
+if __name__ == "__main__":
+    main()
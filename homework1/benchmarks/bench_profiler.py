@@ -0,0 +1,86 @@
+'''
+Overhead of the phase profiler : cost of one stamped cycle (4 perf_counter_ns + PhaseProfiler.stamp),
+SPA loop with and without profiler, and percentile error of the histogram against exact percentiles
+
+From the directory SPA_model :
+    python -m homework1.benchmarks.bench_profiler --steps 200000 --json profile.json
+'''
+import argparse
+import random
+import time
+from ..events.events import EventLog, OFF
+from ..simulation.profiler import Histogram, PhaseProfiler
+from ..simulation.simulation import Simulation, default_environment
+
+
+def loop(steps, seed, profiler=None):
+    """
+    Seconds for steps SPA cycles (a new simulation when the battery gets empty)
+    """
+    random.seed(seed)
+    log = EventLog(level=OFF)
+    done = 0
+    t0 = time.perf_counter()
+    while done < steps:
+        simulation = Simulation(default_environment(), log=log)
+        simulation.profiler = profiler
+        n = simulation.step(steps - done)
+        done += n
+        if n == 0:
+            break
+    return time.perf_counter() - t0, done
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--steps", type=int, default=200000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", help="dump the profile of the SPA loop to this file (.json or .csv)")
+    args = parser.parse_args()
+
+    # one stamped cycle, the phases themselves being empty
+    profiler = PhaseProfiler()
+    now, stamp = profiler.now, profiler.stamp
+    n = 1000000
+    t0 = time.perf_counter()
+    for _ in range(n):
+        t = now()
+        t1 = now()
+        t2 = now()
+        stamp((t, t1, t2, now()))
+    profiler.collect()
+    print(f"stamped cycle (4 clock reads + stamp + binning) : {(time.perf_counter() - t0)/n*1e9:.0f} ns, "
+          f"{(time.perf_counter() - t0)/n*1e9/3:.0f} ns per phase")
+
+    # accuracy on a heavy-tailed distribution
+    rng = random.Random(args.seed)
+    values = [int(rng.lognormvariate(10, 1.5)) for _ in range(200000)]
+    histogram = Histogram()
+    histogram.record_many(values)
+    scalar = Histogram()
+    for value in values:
+        scalar.record(value)
+    assert (scalar.counts == histogram.counts).all()
+    values.sort()
+    for p in (50, 90, 99, 99.9):
+        exact = values[max(0, int(-(-len(values)*p//100)) - 1)]
+        print(f"p{p:<5} exact {exact:>12,} ns  histogram {histogram.percentile(p):>12,} ns  "
+              f"error {histogram.percentile(p)/exact - 1:+.2%}")
+
+    plain = profiled = float("inf")
+    for _ in range(args.repeat):                    # best of : the loop is noisy on a loaded machine
+        elapsed, done = loop(args.steps, args.seed)
+        plain = min(plain, elapsed)
+        profiler = PhaseProfiler()
+        elapsed, _ = loop(args.steps, args.seed, profiler)
+        profiled = min(profiled, elapsed)
+    print(f"SPA loop : {done/plain:,.0f} cycles/s without profiler, {done/profiled:,.0f} with "
+          f"({(profiled - plain)/done*1e9/3:.0f} ns per phase, cycle histogram included)")
+    print(profiler.report())
+    if args.json:
+        profiler.dump(args.json)
+
+
+if __name__ == "__main__":
+    main()
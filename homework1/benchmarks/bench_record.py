@@ -0,0 +1,70 @@
+'''
+Record / replay log : cost of recording, size on disk, memory growth (max RSS) and random seeks
+The states read back from the log are compared with the live run
+
+From the directory SPA_model :
+    python -m homework1.benchmarks.bench_record --steps 1000000
+'''
+import argparse
+import os
+import random
+import tempfile
+import time
+import resource
+from ..simulation.simulation import Simulation
+from ..simulation.record import Recorder, Replay, RECORD
+from ..events.events import EventLog, OFF
+
+
+def record(path, steps, compress, seed):
+    """
+    Returns (seconds, max RSS growth in bytes, states sampled during the run {step: state})
+    """
+    random.seed(seed)
+    simulation = Simulation(log=EventLog(level=OFF))
+    simulation.robot.set_battery(float("inf"))           # never stops : long runs on the default map
+    simulation.recorder = Recorder(path, compress=compress, seed=seed)
+    samples = {}
+    rng = random.Random(seed)
+    picks = set(rng.sample(range(1, steps+1), min(100, steps)))
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    t0 = time.perf_counter()
+    for step in range(1, steps+1):
+        simulation.step()
+        if step in picks:
+            robot = simulation.robot
+            samples[step] = {"position": robot.get_pos(), "orientation": robot._orientation,
+                             "battery": robot.get_battery()}
+    simulation.recorder.close()
+    elapsed = time.perf_counter() - t0
+    growth = (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss)*1024     # ru_maxrss in kB on Linux
+    return elapsed, growth, samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--steps", type=int, default=200000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{args.steps} SPA cycles, {RECORD.size} B / record")
+    print(f"{'log':>6} {'run [s]':>8} {'RSS+ [MB]':>10} {'file [MB]':>10} {'B/step':>7} {'seek [us]':>10} {'mismatches':>11}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for compress in (False, True):
+            path = os.path.join(tmp, "run.spalog")
+            elapsed, peak, samples = record(path, args.steps, compress, args.seed)
+            size = os.path.getsize(path)
+            with Replay(path) as replay:
+                mismatches = sum(replay.state(step-1) != state for step, state in samples.items())
+                rng = random.Random(args.seed)
+                seeks = [rng.randrange(len(replay)) for _ in range(1000)]
+                t0 = time.perf_counter()
+                for k in seeks:
+                    replay[k]
+                seek = (time.perf_counter() - t0)/len(seeks)*1e6
+            print(f"{'zlib' if compress else 'raw':>6} {elapsed:>8.1f} {peak/2**20:>10.2f} {size/2**20:>10.1f} "
+                  f"{size/args.steps:>7.1f} {seek:>10.1f} {mismatches:>11}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+'''
+Fixed 20% return threshold against the return-cost map (battery needed to reach the base from each cell)
+Cells explored per charge by the full Sense -> Plan -> Act loop on seeded maps
+
+From the directory SPA_model :
+    python -m homework1.benchmarks.bench_return --size 30 --maps 5
+'''
+import argparse
+import random
+from ..robot import robot as r
+from ..sense import sense as s
+from ..plan import plan as p
+from ..action import action as a
+from ..events.events import EventLog, OFF
+from .bench_explore import make_environment
+
+
+def run(environment, policy, explorer, target, max_steps, seed):
+    """
+    Returns (explored cells, charges, steps, dead) when the coverage target or max_steps is reached
+    """
+    random.seed(seed)
+    robot = r.Robot("Bench")
+    sense = s.Sense(robot, environment)
+    log = EventLog(level=OFF)
+    planner = p.Plan(robot, environment, explorer=explorer, return_policy=policy, log=log)
+    actuator = a.Action(robot, environment, log=log)
+    grid = planner._grid
+    charges = 0
+    for step in range(1, max_steps+1):
+        charging = planner._instruction[-1] == "charge"
+        actuator.execute(planner.decide(sense.perceive()))
+        if planner._instruction[-1] == "charge" and not charging:
+            charges += 1
+        if robot.get_battery() <= 0 or grid.exploration_rate() >= target:
+            break
+    return grid.visited_count, charges, step, robot.get_battery() <= 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=30)
+    parser.add_argument("--density", type=float, default=0.1)
+    parser.add_argument("--maps", type=int, default=5)
+    parser.add_argument("--explorer", default="frontier", choices=["greedy", "frontier"])
+    parser.add_argument("--target", type=float, default=80.0, help="coverage target in %%")
+    parser.add_argument("--max-steps", type=int, default=20000)
+    args = parser.parse_args()
+
+    print(f"{args.size}x{args.size}, {args.density:.0%} obstacles, {args.explorer} explorer, "
+          f"until {args.target}% coverage or {args.max_steps} steps")
+    print(f"{'seed':>5} {'policy':>10} {'explored':>9} {'charges':>8} {'cells/charge':>13} {'steps':>6} {'dead':>5}")
+    for seed in range(args.maps):
+        for policy in ("threshold", "cost"):
+            environment = make_environment(args.size, args.density, seed)
+            explored, charges, steps, dead = run(environment, policy, args.explorer, args.target, args.max_steps, seed)
+            per_charge = f"{explored/charges:.0f}" if charges else "-"
+            print(f"{seed:>5} {policy:>10} {explored:>9} {charges:>8} {per_charge:>13} {steps:>6} {'yes' if dead else 'no':>5}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+'''
+Memory of Robot / Sensor instances and cost of a position read : __slots__ fields against the old dict layout
+(LegacyRobot / LegacySensor below are the classes as they were, with _pos / _wheels / _sensors dicts)
+
+From the directory SPA_model :
+    python -m homework1.benchmarks.bench_robot_memory --robots 100000
+'''
+import argparse
+import time
+import timeit
+import tracemalloc
+from ..robot import robot as r
+from ..sense import sense as s
+from ..simulation.simulation import Simulation
+from ..events.events import EventLog, OFF
+
+
+class LegacyRobot:
+    def __init__(self, name):
+        self._name = name
+        self._height = 0.1
+        self._lenght = 0.5
+        self._weight = 1.5
+        self._battery = 100.0
+        self._pos = {"x": 0, "y": 0}
+        self._orientation = 0
+        self._wheels = {"front_right": 0.0, "front_left": 0.0}
+        self._sensors = {"distance_array": [0.0, 0.0, 0.0]}
+
+
+class LegacySensor:
+    def __init__(self, name, stype):
+        self._name = name
+        self._type = stype
+        self._range = [0.0, 0.0]
+        self._value = None
+
+
+def memory(factory, n):
+    """
+    Bytes allocated per instance
+    """
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [factory(k) for k in range(n)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objects
+    return (after - before)/n
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--robots", type=int, default=100000)
+    parser.add_argument("--steps", type=int, default=50000, help="SPA cycles for the loop throughput")
+    args = parser.parse_args()
+
+    n = args.robots
+    print(f"{'memory / instance':<26} {'dicts [B]':>10} {'slots [B]':>10}")
+    robot_old = memory(lambda k: LegacyRobot(f"R{k}"), n)
+    robot_new = memory(lambda k: r.Robot(f"R{k}"), n)
+    print(f"{'Robot':<26} {robot_old:>10.0f} {robot_new:>10.0f}   {n} robots : {robot_old*n/2**20:.1f} MB -> {robot_new*n/2**20:.1f} MB")
+    sensor_old = memory(lambda k: LegacySensor(f"S{k}", "lidar"), n)
+    sensor_new = memory(lambda k: s.Sensor(f"S{k}", "lidar"), n)
+    print(f"{'Sensor':<26} {sensor_old:>10.0f} {sensor_new:>10.0f}")
+
+    old, new = LegacyRobot("old"), r.Robot("new")
+    reps = 1000000
+    t_old = timeit.timeit(lambda: (old._pos["x"], old._pos["y"]), number=reps)/reps*1e9
+    t_new = timeit.timeit(lambda: (new._x, new._y), number=reps)/reps*1e9
+    t_get = timeit.timeit(new.get_pos, number=reps)/reps*1e9
+    print(f"position read [ns] : _pos dict {t_old:.0f}, slots {t_new:.0f}, get_pos() {t_get:.0f}")
+
+    simulation = Simulation(log=EventLog(level=OFF))
+    t0 = time.perf_counter()
+    done = simulation.step(args.steps)
+    elapsed = time.perf_counter() - t0
+    print(f"SPA loop : {done/elapsed:,.0f} cycles/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+'''
+Benchmark of the planner search engines against the former path-copying BFS
+Reports nodes expanded, peak memory (tracemalloc) and wall time for each grid size
+
+From the directory SPA_model :
+    python -m homework1.benchmarks.bench_search --sizes 100 500 1000 2000
+'''
+import argparse
+import random
+import time
+import tracemalloc
+from collections import deque
+from ..plan.search import ENGINES
+from ..world.grid import Grid
+
+
+def legacy_bfs(start, goal, map_size, obstacles, stats=None):
+    """
+    BFS as it was in Plan.go_recharge : every queue entry carries a copy of its path (obstacles as a set of tuples)
+    """
+    width, height = map_size
+    queue = deque([(start, [])])
+    visited = {start}
+    expanded = 0
+    while queue:
+        (x, y), path = queue.popleft()
+        expanded += 1
+        for dx, dy in [(1,0), (-1,0), (0,1), (0,-1)]:
+            nx, ny = x + dx, y + dy
+            next_pos = (nx, ny)
+            if (0 <= nx < width and 0 <= ny < height
+                and next_pos not in obstacles
+                and next_pos not in visited):
+                if next_pos == goal:
+                    if stats is not None:
+                        stats["expanded"] = expanded
+                    return path + [next_pos]
+                queue.append((next_pos, path + [next_pos]))
+                visited.add(next_pos)
+    if stats is not None:
+        stats["expanded"] = expanded
+    return None
+
+
+def make_map(size, density, seed):
+    """
+    Square map with random obstacles, the corners (start and goal) are kept free
+    """
+    rng = random.Random(seed)
+    obstacles = {(x, y) for x in range(size) for y in range(size) if rng.random() < density}
+    obstacles.discard((0, 0))
+    obstacles.discard((size-1, size-1))
+    return obstacles
+
+
+def measure(engine, start, goal, grid, memory=True):
+    """
+    One timed run, then one run under tracemalloc for the peak memory
+    """
+    stats = {}
+    t0 = time.perf_counter()
+    path = engine(start, goal, grid, stats)
+    wall = time.perf_counter() - t0
+    peak = None
+    if memory:
+        tracemalloc.start()
+        engine(start, goal, grid)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    length = len(path) if path is not None else None
+    return {"expanded": stats["expanded"], "length": length, "wall_s": wall, "peak_bytes": peak}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 250, 500, 1000, 2000])
+    parser.add_argument("--density", type=float, default=0.1, help="obstacle density")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--legacy-max", type=int, default=1000,
+                        help="largest size for the path-copying BFS (its memory is O(L²))")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc runs")
+    args = parser.parse_args()
+
+    print(f"{'size':>6} {'engine':>10} {'expanded':>10} {'length':>7} {'wall [ms]':>10} {'peak [MiB]':>11}")
+    for size in args.sizes:
+        obstacles = make_map(size, args.density, args.seed)
+        grid = Grid((size, size), obstacles)
+        engines = {"legacy_bfs": lambda s, g, _grid, stats=None: legacy_bfs(s, g, (size, size), obstacles, stats)}
+        engines.update(ENGINES)
+        start, goal = (0, 0), (size-1, size-1)
+        for name, engine in engines.items():
+            if name == "legacy_bfs" and size > args.legacy_max:
+                print(f"{size:>6} {name:>10} {'skipped':>10}")
+                continue
+            res = measure(engine, start, goal, grid, memory=not args.no_memory)
+            peak = f"{res['peak_bytes']/2**20:.1f}" if res["peak_bytes"] is not None else "-"
+            print(f"{size:>6} {name:>10} {res['expanded']:>10} {str(res['length']):>7} "
+                  f"{res['wall_s']*1000:>10.1f} {peak:>11}")
+
+
+if __name__ == "__main__":
+    main()
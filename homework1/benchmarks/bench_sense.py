@@ -0,0 +1,82 @@
+'''
+Cost of Sense.perceive per cycle : every sensor polled (former behaviour, all fields) against
+the fields the planner reads (Plan.PERCEPTION), with and without an expensive sensor polled at a low rate
+
+From the directory SPA_model :
+    python -m homework1.benchmarks.bench_sense --cycles 200000
+'''
+import argparse
+import time
+from ..robot import robot as r
+from ..sense import sense as s
+from ..plan import plan as p
+from ..simulation.simulation import Simulation, default_environment
+from ..events.events import EventLog, OFF
+
+
+class SlowSensor(s.Sensor):
+    '''
+    Stand-in for a camera / depth sensor : 50 us per collect_data
+    '''
+    __slots__ = ()
+
+    def collect_data(self, robot=None, environment=None):
+        end = time.perf_counter() + 50e-6
+        while time.perf_counter() < end:
+            pass
+        self._value = "nothing"
+        return self._value
+
+
+def legacy_perceive(sense):
+    """
+    Former Sense.perceive : every sensor polled each cycle, then the perception built from the grid
+    """
+    for sensor in sense.sensors.values():
+        sensor.collect_data(robot=sense.robot, environment=sense.environment)
+    return sense.perceive()
+
+
+def timed(perceive, cycles):
+    t0 = time.perf_counter()
+    for _ in range(cycles):
+        perceive()
+    return (time.perf_counter() - t0)/cycles*1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cycles", type=int, default=200000)
+    parser.add_argument("--camera-rate", type=float, default=1.0, help="camera polls per simulated second")
+    parser.add_argument("--dt", type=float, default=0.05, help="simulated seconds per cycle")
+    args = parser.parse_args()
+
+    environment = default_environment()
+    robot = r.Robot("Bench")
+    rows = []
+    sense = s.Sense(robot, environment)
+    rows.append(("every sensor, all fields (before)", timed(lambda: legacy_perceive(sense), args.cycles)))
+    sense = s.Sense(robot, environment)
+    rows.append(("polled on demand, all fields", timed(sense.perceive, args.cycles)))
+    sense = s.Sense(robot, environment, fields=p.Plan.PERCEPTION)
+    rows.append(("planner fields only", timed(sense.perceive, args.cycles)))
+
+    cycles = args.cycles // 10
+    sense = s.Sense(robot, environment, fields=p.Plan.PERCEPTION, dt=args.dt)
+    sense.add_sensor("camera", SlowSensor("C1", "video"))
+    rows.append(("+ camera every cycle", timed(sense.perceive, cycles)))
+    sense.sensors["camera"].set_rate(args.camera_rate)
+    rows.append((f"+ camera at {args.camera_rate:g} Hz (dt {args.dt:g} s)", timed(sense.perceive, cycles)))
+    for name, us in rows:
+        print(f"{name:<36} {us:>7.2f} us / perceive")
+
+    for lidar in ("grid", "table"):
+        simulation = Simulation(lidar=lidar, log=EventLog(level=OFF))
+        t0 = time.perf_counter()
+        done = simulation.step(args.cycles // 4)
+        elapsed = time.perf_counter() - t0
+        print(f"SPA loop (planner fields, lidar {lidar:>5}) : {done/elapsed:,.0f} cycles/s")
+
+
+if __name__ == "__main__":
+    main()
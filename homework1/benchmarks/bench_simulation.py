@@ -0,0 +1,44 @@
+'''
+Headless SPA cycles per second (Simulation.step, no display, no sleep) on the default 10x10 map
+Events of Plan / Action are not recorded (EventLog level OFF, the cost of the log is in bench_events)
+
+From the directory SPA_model :
+    python -m homework1.benchmarks.bench_simulation --steps 100000
+'''
+import argparse
+import random
+import time
+from ..simulation.simulation import Simulation, default_environment
+from ..events.events import EventLog, OFF
+
+
+def run(steps, seed):
+    """
+    Returns (cycles done, seconds), a new simulation is started when the battery gets empty
+    """
+    random.seed(seed)
+    done = 0
+    elapsed = 0.0
+    while done < steps:
+        simulation = Simulation(default_environment(), log=EventLog(level=OFF))
+        t0 = time.perf_counter()
+        n = simulation.step(steps - done)
+        elapsed += time.perf_counter() - t0
+        done += n
+        if n == 0:
+            break
+    return done, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--steps", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    done, elapsed = run(args.steps, args.seed)
+    print(f"{done} SPA cycles in {elapsed:.2f} s : {done/elapsed:,.0f} cycles/s")
+
+
+if __name__ == "__main__":
+    main()
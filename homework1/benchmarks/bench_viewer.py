@@ -0,0 +1,82 @@
+'''
+Frames per second of the pygame viewer : full redraw of every cell and obstacle (former main.py drawing)
+against the cached static layer + dirty rectangles, with a fleet of robots moving on the map
+Runs without a window (SDL dummy video driver)
+
+From the directory SPA_model :
+    python -m homework1.benchmarks.bench_viewer --size 1000 --robots 300 --frames 200
+'''
+import argparse
+import os
+import time
+import numpy as np
+from ..simulation.fleet import FleetSimulation
+from .bench_explore import make_environment
+
+
+def legacy_draw(viewer):
+    """
+    Drawing of the former main.py : clear, grid lines, base, every obstacle, robots, flip
+    """
+    pygame, screen = viewer.pygame, viewer.screen
+    simulation = viewer.simulation
+    cs = viewer.cell_size
+    screen.fill((255, 255, 255))
+    for k in range(simulation.grid.width):
+        pygame.draw.line(screen, (200, 200, 200), (k*cs, 0), (k*cs, viewer.height))
+    for k in range(simulation.grid.height):
+        pygame.draw.line(screen, (200, 200, 200), (0, k*cs), (viewer.width, k*cs))
+    x, y = simulation.environment["recharge_zone"]
+    pygame.draw.rect(screen, (0, 255, 0), (x*cs, y*cs, max(1, cs), max(1, cs)))
+    for (x, y) in simulation.grid.obstacles():
+        pygame.draw.rect(screen, (100, 0, 100), (x*cs, y*cs, max(1, cs), max(1, cs)))
+    for x, y in viewer.robots():
+        pygame.draw.circle(screen, (0, 100, 255), (x*cs + cs//2, y*cs + cs//2), max(1, cs//3))
+    pygame.display.flip()
+
+
+def fps(viewer, fleet, frames, draw):
+    rng = np.random.default_rng(0)
+    grid = fleet.grid
+    t0 = time.perf_counter()
+    for _ in range(frames):
+        # robots move one cell per frame (random walk : the planner is not measured here)
+        fleet.x = np.clip(fleet.x + rng.integers(-1, 2, fleet.size), 0, grid.width-1)
+        fleet.y = np.clip(fleet.y + rng.integers(-1, 2, fleet.size), 0, grid.height-1)
+        draw(viewer)
+    return frames/(time.perf_counter() - t0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=1000)
+    parser.add_argument("--density", type=float, default=0.1)
+    parser.add_argument("--robots", type=int, default=300)
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--legacy-frames", type=int, default=3)
+    args = parser.parse_args()
+
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    from ..viewer.viewer import Viewer
+    environment = make_environment(args.size, args.density, 0)
+    rng = np.random.default_rng(0)
+    fleet = FleetSimulation(args.robots, environment, seed=0,
+                            positions=rng.integers(0, args.size, (args.robots, 2)).tolist())
+    viewer = Viewer(fleet)
+    print(f"{args.size}x{args.size}, {args.density:.0%} obstacles, {args.robots} robots, "
+          f"window {viewer.width}x{viewer.height}")
+    t0 = time.perf_counter()
+    viewer.draw()
+    print(f"static layer built in {(time.perf_counter() - t0)*1000:.0f} ms")
+    print(f"cached layer + dirty rects : {fps(viewer, fleet, args.frames, Viewer.draw):.0f} FPS")
+    viewer.zoom(8)
+    viewer.draw()
+    print(f"same, zoomed x8            : {fps(viewer, fleet, args.frames, Viewer.draw):.0f} FPS")
+    viewer.zoom(1/8)
+    if args.legacy_frames:
+        print(f"full redraw (former main)  : {fps(viewer, fleet, args.legacy_frames, legacy_draw):.1f} FPS")
+    viewer.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+'''
+Soak test : millions of SPA cycles on one simulation, memory measured every --every cycles
+(Python heap with tracemalloc, process RSS) and reported as growth per million cycles after a warm-up.
+A steady run should show ~0 growth : every cache of the planner is bounded (paths, fields, decision history).
+
+From the directory SPA_model :
+    python -m homework1.benchmarks.soak --cycles 2000000 --every 250000
+    python -m homework1.benchmarks.soak --unbounded             # unbounded decision history (former behaviour)
+    python -m homework1.benchmarks.soak --compact --size 1000   # visited cells packed 1 bit per cell
+'''
+import argparse
+import os
+import random
+import resource
+import time
+import tracemalloc
+from ..events.events import EventLog, OFF
+from ..simulation.simulation import Simulation
+from ..simulation.montecarlo import random_environment
+
+
+def rss():
+    """
+    Resident set size in MB (current from /proc, else the peak from getrusage)
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1])*os.sysconf("SC_PAGE_SIZE")/2**20
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss/1024
+
+
+def growth(points):
+    """
+    Least-squares slope of (cycles, MB) points, in MB per million cycles
+    """
+    n = len(points)
+    if n < 2:
+        return 0.0
+    mx = sum(c for c, _ in points)/n
+    my = sum(m for _, m in points)/n
+    var = sum((c - mx)**2 for c, _ in points)
+    return sum((c - mx)*(m - my) for c, m in points)/var*1e6 if var else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cycles", type=int, default=2000000)
+    parser.add_argument("--every", type=int, default=250000, help="cycles between two measures")
+    parser.add_argument("--warmup", type=int, default=1, help="measures ignored in the growth (caches filling)")
+    parser.add_argument("--size", type=int, default=50)
+    parser.add_argument("--density", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--history", type=int, default=16, help="decisions kept by the planner (>= 1)")
+    parser.add_argument("--unbounded", action="store_true", help="keep every decision (history=None)")
+    parser.add_argument("--compact", action="store_true", help="visited cells packed 1 bit per cell")
+    parser.add_argument("--no-tracemalloc", action="store_true", help="RSS only (tracemalloc slows the loop ~2x)")
+    args = parser.parse_args()
+
+    environment = random_environment(args.size, args.density, random.Random(args.seed))
+    environment["compact_visited"] = args.compact
+    random.seed(args.seed)
+    simulation = Simulation(environment, log=EventLog(level=OFF), history=None if args.unbounded else args.history)
+    if not args.no_tracemalloc:
+        tracemalloc.start()
+    heap, resident = [], []
+    done = 0
+    revived = 0
+    t0 = time.perf_counter()
+    print(f"{'cycles':>10} {'seconds':>8} {'heap MB':>9} {'RSS MB':>8} {'history':>8} {'frontier':>9}")
+    while done < args.cycles:
+        n = min(args.every, args.cycles - done)
+        while n:
+            k = simulation.step(n)
+            n -= k
+            done += k
+            if simulation.done:                 # stranded robot : keep the same planner running
+                simulation.robot.set_battery(100)
+                revived += 1
+        traced = tracemalloc.get_traced_memory()[0]/2**20 if tracemalloc.is_tracing() else float("nan")
+        heap.append((done, traced))
+        resident.append((done, rss()))
+        print(f"{done:>10,} {time.perf_counter() - t0:>8.1f} {traced:>9.2f} {resident[-1][1]:>8.1f} "
+              f"{len(simulation.planner._instruction):>8} {len(simulation.grid.frontier):>9}")
+    tracemalloc.stop()
+    points = slice(args.warmup, None)
+    report = f"growth per million cycles : RSS {growth(resident[points]):+.3f} MB"
+    if not args.no_tracemalloc:
+        report += f", Python heap {growth(heap[points]):+.3f} MB"
+    print(report + (f" ({revived} battery resets)" if revived else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,363 @@
+'''
+Benchmark suite : planner, perception, actuation, full SPA cycle and behaviour tree ticks on seeded maps
+Every case is timed in rounds of calls (best of --repeat), the results are saved as JSON with the commit,
+so that runs on different commits can be compared side by side with --compare
+
+From the directory SPA_model :
+    python -m homework1.benchmarks.suite --json before.json
+    python -m homework1.benchmarks.suite --json after.json --compare before.json
+    python -m homework1.benchmarks.suite --filter plan.go_recharge --sizes 10 50 200
+
+The behaviour tree cases load bt/ and homework3/ from the SPA_model directory, they are skipped
+when py_trees is not installed.
+'''
+import argparse
+import contextlib
+import datetime
+import importlib.util
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import numpy as np
+from ..robot import robot as r
+from ..sense import sense as s
+from ..plan import plan as p
+from ..action import action as a
+from ..events.events import EventLog, OFF
+from ..world.grid import get_grid
+from ..simulation.simulation import Simulation
+from ..simulation.montecarlo import random_environment
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))     # SPA_model
+QUIET = EventLog(level=OFF)
+CASES = {}
+
+
+class Skip(Exception):
+    '''
+    The case can't run here (missing optional dependency)
+    '''
+
+
+def case(name, **grid):
+    """
+    Register a case : setup(seed, **params) returns run(n) -> seconds for n calls,
+    grid gives the parameter values (their product is benchmarked, "sizes" / "densities" from the command line)
+    """
+    def register(setup):
+        CASES[name] = (setup, grid)
+        return setup
+    return register
+
+
+def seeded_map(size, density, seed):
+    """
+    Random map of the suite : the same seed gives the same obstacles and recharge zone on every commit
+    """
+    return random_environment(size, density, random.Random(seed))
+
+
+def free_cells(environment, count, seed):
+    """
+    count random free cells (start positions)
+    """
+    grid = get_grid(environment)
+    cells = [grid.cell(int(i)) for i in np.flatnonzero(grid.occupancy.reshape(-1) == 0)]
+    rng = random.Random(seed)
+    return [rng.choice(cells) for _ in range(count)]
+
+
+def planner_on(size, density, seed, **options):
+    environment = seeded_map(size, density, seed)
+    robot = r.Robot("Bench")
+    return environment, robot, p.Plan(robot, environment, log=QUIET, **options)
+
+
+@case("plan.go_recharge", goal=("base", "random"))
+def go_recharge(seed, size, density, goal):
+    """
+    base : next step toward the recharge zone (cached distance field, built before timing)
+    random : next step toward a random goal, path cache off (one search per call)
+    """
+    environment, _, planner = planner_on(size, density, seed)
+    planner.path_cache_size = 0
+    starts = free_cells(environment, 1024, seed)
+    if goal == "base":
+        goals = [environment["recharge_zone"]]*len(starts)
+        planner.get_field(goals[0])
+    else:
+        goals = free_cells(environment, len(starts), seed + 1)
+    calls = list(zip(starts, goals))
+
+    def run(n):
+        go = planner.go_recharge
+        t0 = time.perf_counter()
+        for k in range(n):
+            start, target = calls[k % len(calls)]
+            go(start, target)
+        return time.perf_counter() - t0
+    return run
+
+
+@case("plan.find_next_cell")
+def find_next_cell(seed, size, density):
+    environment, robot, planner = planner_on(size, density, seed)
+    sense = s.Sense(robot, environment, fields=p.Plan.PERCEPTION)
+    calls = []
+    for x, y in free_cells(environment, 1024, seed):
+        robot.set_pos(x, y)
+        calls.append((x, y, sense.perceive()))
+
+    def run(n):
+        find = planner.find_next_cell
+        t0 = time.perf_counter()
+        for k in range(n):
+            x, y, perception = calls[k % len(calls)]
+            find(x, y, perception)
+        return time.perf_counter() - t0
+    return run
+
+
+def simulation_on(size, density, seed, **options):
+    random.seed(seed)
+    return Simulation(seeded_map(size, density, seed), log=QUIET, **options)
+
+
+@case("plan.decide")
+def decide(seed, size, density):
+    """
+    decide inside a running simulation (only decide is timed, a new simulation when the battery is empty)
+    """
+    simulation = simulation_on(size, density, seed)
+
+    def run(n):
+        nonlocal simulation
+        elapsed = 0.0
+        for _ in range(n):
+            if simulation.done:
+                simulation = simulation_on(size, density, seed)
+            perception = simulation.sense.perceive()
+            t0 = time.perf_counter()
+            decision = simulation.planner.decide(perception)
+            elapsed += time.perf_counter() - t0
+            simulation.actuator.execute(decision)
+        return elapsed
+    return run
+
+
+@case("sense.perceive", lidar=("grid", "table"))
+def perceive(seed, size, density, lidar):
+    environment = seeded_map(size, density, seed)
+    robot = r.Robot("Bench")
+    sense = s.Sense(robot, environment, lidar=lidar, fields=p.Plan.PERCEPTION)
+    starts = free_cells(environment, 1024, seed)
+
+    def run(n):
+        set_pos, perceive_ = robot.set_pos, sense.perceive
+        t0 = time.perf_counter()
+        for k in range(n):
+            set_pos(*starts[k % len(starts)])
+            perceive_()
+        return time.perf_counter() - t0
+    return run
+
+
+@case("action.execute")
+def execute(seed, size, density):
+    """
+    Mixed instruction lists : move_to a neighbour, turns, move_forward, recharge
+    """
+    environment = seeded_map(size, density, seed)
+    robot = r.Robot("Bench")
+    actuator = a.Action(robot, environment, log=QUIET)
+    calls = []
+    for x, y in free_cells(environment, 1024, seed):
+        target = (min(x+1, size-1), y)
+        calls.append(((x, y), [("turn_left", 1.0), ("move_to", target), ("turn_right", 1.0),
+                               ("move_forward", 1.0), ("recharge", 1.0)]))
+
+    def run(n):
+        set_pos, execute_ = robot.set_pos, actuator.execute
+        t0 = time.perf_counter()
+        for k in range(n):
+            start, instructions = calls[k % len(calls)]
+            set_pos(*start)
+            execute_(instructions)
+        return time.perf_counter() - t0
+    return run
+
+
+@case("spa.cycle")
+def spa_cycle(seed, size, density):
+    simulation = simulation_on(size, density, seed)
+
+    def run(n):
+        nonlocal simulation
+        elapsed = 0.0
+        while n > 0:
+            if simulation.done:
+                simulation = simulation_on(size, density, seed)
+            t0 = time.perf_counter()
+            done = simulation.step(n)
+            elapsed += time.perf_counter() - t0
+            n -= done
+        return elapsed
+    return run
+
+
+def load_module(name, path):
+    """
+    Module of a file outside the package (bt/, homework3/), Skip if py_trees is missing
+    """
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    try:
+        spec.loader.exec_module(module)
+    except ImportError as error:
+        raise Skip(str(error)) from error
+    return module
+
+
+@case("bt.tick", tree=("bt", "homework3"))
+def bt_tick(seed, size, density, tree):
+    """
+    tick_once of create_battery_reactive_tree() (the map parameters are not used)
+    """
+    path = {"bt": os.path.join(ROOT, "bt", "battery_reactive_bt_demo.py"),
+            "homework3": os.path.join(ROOT, "homework3", "reactive_robot_update.py")}[tree]
+    module = load_module(f"spa_bench_{tree}", path)
+    py_trees = module.py_trees
+    py_trees.blackboard.Blackboard.clear()
+    root = module.create_battery_reactive_tree()
+    blackboard = py_trees.blackboard.Client(name="Bench")
+    blackboard.register_key(key="battery_level", access=py_trees.common.Access.WRITE)
+    blackboard.set("battery_level", 100.0)
+    root.setup_with_descendants()
+    random.seed(seed)                       # homework3 : random failures of MoveToObj / GraspObject
+
+    def run(n):
+        tick = root.tick_once
+        with contextlib.redirect_stdout(io.StringIO()):     # homework3 Loop prints the child status
+            t0 = time.perf_counter()
+            for _ in range(n):
+                tick()
+            return time.perf_counter() - t0
+    return run
+
+
+def measure(run, repeat, min_time):
+    """
+    Calls per round so that a round lasts min_time, then repeat rounds : seconds per call of each round
+    """
+    n = 1
+    while True:
+        elapsed = run(n)
+        if elapsed >= min_time or n >= 1 << 24:
+            break
+        n = max(n*2, int(n*min_time/max(elapsed, 1e-9)*1.2))
+    rounds = [elapsed/n] + [run(n)/n for _ in range(repeat - 1)]
+    return n, rounds
+
+
+def commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def expand(grid, sizes, densities):
+    """
+    Parameter sets of a case
+    """
+    sets = [{"size": size, "density": density} for size in sizes for density in densities]
+    for key, values in grid.items():
+        sets = [dict(params, **{key: value}) for params in sets for value in values]
+    return sets
+
+
+def label(name, params):
+    return name + "[" + ",".join(f"{k}={v}" for k, v in params.items()) + "]"
+
+
+def run_suite(names, sizes, densities, seed, repeat, min_time, out=sys.stdout):
+    results = []
+    for name in names:
+        setup, grid = CASES[name]
+        for params in expand(grid, sizes, densities):
+            if name == "bt.tick" and (params["size"], params["density"]) != (sizes[0], densities[0]):
+                continue                    # the tree doesn't use the map : run once
+            try:
+                run = setup(seed, **params)
+            except Skip as error:
+                print(f"{label(name, params):<60} skipped ({error})", file=out)
+                results.append({"name": name, "params": params, "skipped": str(error)})
+                continue
+            calls, rounds = measure(run, repeat, min_time)
+            us = [t*1e6 for t in rounds]
+            result = {"name": name, "params": params, "calls": calls,
+                      "min_us": min(us), "median_us": statistics.median(us), "rounds_us": us}
+            results.append(result)
+            print(f"{label(name, params):<60} {result['min_us']:>11.2f} us  (median {result['median_us']:.2f})", file=out)
+    return results
+
+
+def compare(results, path):
+    """
+    Side by side table against a previous JSON run (ratio < 1 : faster now)
+    """
+    with open(path) as f:
+        old = json.load(f)
+    before = {label(r["name"], r["params"]): r for r in old["results"] if "min_us" in r}
+    print(f"\n{'case':<60} {old.get('commit') or 'before':>11} {'now':>11}  ratio")
+    for result in results:
+        key = label(result["name"], result["params"])
+        if "min_us" in result and key in before:
+            b = before[key]["min_us"]
+            print(f"{key:<60} {b:>11.2f} {result['min_us']:>11.2f}  {result['min_us']/b:5.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--filter", default="", help="only the cases whose name contains this text")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--densities", type=float, nargs="+", default=[0.0, 0.2])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5, help="rounds per case (the best one is kept)")
+    parser.add_argument("--min-time", type=float, default=0.05, help="seconds per round")
+    parser.add_argument("--json", help="save the results to this file")
+    parser.add_argument("--compare", help="previous JSON results to compare with")
+    parser.add_argument("--list", action="store_true", help="list the cases and exit")
+    args = parser.parse_args()
+
+    if args.list:
+        for name, (setup, grid) in CASES.items():
+            print(f"{name:<22} {grid or ''}")
+        return
+    names = [name for name in CASES if args.filter in name]
+    meta = {
+        "commit": commit(),
+        "date": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.platform(),
+        "seed": args.seed, "sizes": args.sizes, "densities": args.densities,
+        "repeat": args.repeat, "min_time": args.min_time,
+    }
+    results = run_suite(names, args.sizes, args.densities, args.seed, args.repeat, args.min_time)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(dict(meta, results=results), f, indent=1)
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
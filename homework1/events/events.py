@@ -0,0 +1,144 @@
+'''
+Events interface
+
+Structured event log used instead of print() in the SPA loop
+- an event is (time, level, name, message, args) : the message is only formatted (message % args)
+  when the buffer is flushed, a call below the level costs one attribute read and one comparison
+  at the call site :  if log.level <= DEBUG: log.emit(DEBUG, "plan.exploration", "Exploration : %s%%", rate)
+- sampling : log.sample["plan.exploration"] = 100 keeps 1 event out of 100 of this name
+- events are kept in a ring buffer (the last capacity events), written in bulk to the sink
+  when it is full or when flush() is called. sink None : memory only (post-mortem, log.events())
+- level OFF disables everything
+'''
+import atexit
+import json
+import sys
+import time
+from collections import deque
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+OFF = 100
+LEVELS = {"debug": DEBUG, "info": INFO, "warning": WARNING, "error": ERROR, "off": OFF}
+NAMES = {value: name.upper() for name, value in LEVELS.items()}
+
+
+class EventLog:
+    '''
+    Levelled, sampled event log with an in-memory ring buffer flushed in bulk
+    sink : "stdout" (sys.stdout when flushing, so redirect_stdout still works), a file object or None
+    fmt : "text" (one line per event) or "json" (JSON lines)
+    '''
+
+    def __init__(self, level=INFO, capacity=4096, sink="stdout", fmt="text", now=time.perf_counter):
+        if fmt not in ("text", "json"):
+            raise ValueError(f"Unknown format {fmt}, expected 'text' or 'json'")
+        self.level = level                  # events under this level are not recorded
+        self.sink = sink
+        self.fmt = fmt
+        self.sample = {}                    # event name -> keep 1 event out of n
+        self._counts = {}                   # event name -> events seen (sampling)
+        self._buffer = deque(maxlen=capacity)
+        self._now = now
+        self._start = now()
+        self.emitted = 0                    # events recorded
+        self.dropped = 0                    # events lost : ring buffer full without sink
+
+    def __repr__(self):
+        return (f"<EventLog level={NAMES.get(self.level, self.level)} buffered={len(self._buffer)} "
+                f"emitted={self.emitted} dropped={self.dropped}>")
+
+    def set_level(self, level):
+        """
+        level : int or name ("debug", "info", "warning", "error", "off")
+        """
+        self.level = LEVELS[level.lower()] if isinstance(level, str) else level
+        return self.level
+
+    def enabled(self, level):
+        return self.level <= level
+
+    def emit(self, level, name, message, *args):
+        """
+        Record an event (the caller has already checked the level in the hot path)
+        """
+        if level < self.level:
+            return False
+        every = self.sample.get(name)
+        if every is not None and every > 1:
+            count = self._counts.get(name, 0)
+            self._counts[name] = count + 1
+            if count % every:
+                return False
+        buffer = self._buffer
+        if len(buffer) == buffer.maxlen:
+            if self.sink is None:
+                self.dropped += 1               # the oldest event is overwritten
+            else:
+                self.flush()
+        buffer.append((self._now() - self._start, level, name, message, args))
+        self.emitted += 1
+        return True
+
+    def debug(self, name, message, *args):
+        if self.level <= DEBUG:
+            self.emit(DEBUG, name, message, *args)
+
+    def info(self, name, message, *args):
+        if self.level <= INFO:
+            self.emit(INFO, name, message, *args)
+
+    def warning(self, name, message, *args):
+        if self.level <= WARNING:
+            self.emit(WARNING, name, message, *args)
+
+    def error(self, name, message, *args):
+        if self.level <= ERROR:
+            self.emit(ERROR, name, message, *args)
+
+    def events(self):
+        """
+        Buffered events as dicts (oldest first), the buffer is not emptied
+        """
+        return [{"t": t, "level": NAMES.get(level, level), "event": name, "message": format_message(message, args)}
+                for t, level, name, message, args in self._buffer]
+
+    def format(self, event):
+        t, level, name, message, args = event
+        if self.fmt == "json":
+            return json.dumps({"t": round(t, 6), "level": NAMES.get(level, level), "event": name,
+                               "message": format_message(message, args)})
+        return f"{t:10.4f} {NAMES.get(level, level):<7} {name} : {format_message(message, args)}"
+
+    def flush(self):
+        """
+        Write the buffered events to the sink in one call and empty the buffer
+        """
+        if not self._buffer or self.sink is None:
+            return 0
+        sink = sys.stdout if self.sink == "stdout" else self.sink
+        n = len(self._buffer)
+        sink.write("\n".join(map(self.format, self._buffer)) + "\n")
+        self._buffer.clear()
+        return n
+
+    def clear(self):
+        self._buffer.clear()
+
+
+def format_message(message, args):
+    return message % args if args else message
+
+
+# Shared log of the package : Plan, Action, Sense... use it unless they get their own
+LOG = EventLog()
+atexit.register(LOG.flush)
+
+
+def get_log(log=None):
+    """
+    log itself, or the shared log of the package
+    """
+    return LOG if log is None else log
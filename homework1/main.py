@@ -2,81 +2,64 @@
 SENSE PLAN ACT Simple Python implementation
 using 00P-classes 
 '''
+import argparse
 import sys
-import pygame
-from .robot import robot as r
-from .sense import sense as s
-from .plan import plan as p
-from .action import action as a
-
-# Paramètres
-CELL_SIZE = 50
-GRID_WIDTH = 10
-GRID_HEIGHT = 10
-SCREEN_WIDTH = CELL_SIZE * GRID_WIDTH
-SCREEN_HEIGHT = CELL_SIZE * GRID_HEIGHT
-
-pygame.init() # pylint: disable=no-member
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-pygame.display.set_caption("SPA Robot Simulation")
-clock = pygame.time.Clock()
-
-def draw_grid():
-    for x in range(0, SCREEN_WIDTH, CELL_SIZE):
-        pygame.draw.line(screen, (200, 200, 200), (x, 0), (x, SCREEN_HEIGHT))
-    for y in range(0, SCREEN_HEIGHT, CELL_SIZE):
-        pygame.draw.line(screen, (200, 200, 200), (0, y), (SCREEN_WIDTH, y))
-
-def draw_robot(robot):
-    x, y = robot._pos["x"], robot._pos["y"]
-    pygame.draw.circle(screen, (0, 100, 255), (x*CELL_SIZE + CELL_SIZE//2, y*CELL_SIZE + CELL_SIZE//2), CELL_SIZE//3)
-
-def draw_base(pos):
-    x, y = pos
-    pygame.draw.rect(screen, (0, 255, 0), (x*CELL_SIZE, y*CELL_SIZE, CELL_SIZE, CELL_SIZE))
-
-def draw_obs(pos):
-    x, y = pos
-    pygame.draw.rect(screen, (100, 0, 100), (x*CELL_SIZE, y*CELL_SIZE, CELL_SIZE, CELL_SIZE))
+from .simulation.simulation import Simulation, default_environment
+from .simulation.clock import FixedStepClock
+from .simulation.profiler import PhaseProfiler
+from .world.maps import load_map
+from .viewer.viewer import Viewer
+from .events import events
 
 def main():
-    turtle = r.Robot("Turtle")
-    environment = {"map_size": (GRID_WIDTH,GRID_HEIGHT), "recharge_zone": (4,5), "obstacles": {(2, 3),(5, 5), (5, 8),(4, 9)}}
-    sense = s.Sense(turtle, environment)
-    planner = p.Plan(turtle, environment)
-    actuator = a.Action(turtle, environment)
+    parser = argparse.ArgumentParser(description="SPA robot simulation (+ / - : faster / slower)")
+    parser.add_argument("--rate", type=float, default=2.0, help="SPA cycles per simulated second")
+    parser.add_argument("--fps", type=float, default=30.0, help="max frames per second")
+    parser.add_argument("--speed", type=float, default=1.0, help="fast-forward multiplier")
+    parser.add_argument("--map", help="map file (.txt ASCII, .png or .npy), default : the 10x10 demo map")
+    parser.add_argument("--log", default="debug", choices=list(events.LEVELS), help="level of the events written to the console")
+    parser.add_argument("--log-sample", type=int, default=1, help="keep 1 per-cycle event out of n")
+    parser.add_argument("--profile", help="time each phase (sense / plan / act / draw), summary written to this .json or .csv file")
+    args = parser.parse_args()
+    events.LOG.set_level(args.log)
+    for name in ("plan.exploration", "plan.path", "action.move", "action.recharge"):
+        events.LOG.sample[name] = args.log_sample
+
+    environment = load_map(args.map) if args.map else default_environment()
+    simulation = Simulation(environment)
+    clock = FixedStepClock(sim_rate=args.rate, render_rate=args.fps, speed=args.speed)
+    viewer = Viewer(simulation, clock=clock)
+    profiler = None
+    if args.profile:
+        profiler = simulation.profiler = PhaseProfiler()
 
     running = True
-    step = 0
     while running:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT: # pylint: disable=no-member
-                running = False
+        running = viewer.handle_events()
 
-        # SPA cycle
-        perception = sense.perceive()
-        decision = planner.decide(perception)
-        actuator.execute(decision)
+        # SPA cycles due since the last loop
+        simulation.step(clock.tick())
 
         # Dessin
-        screen.fill((255, 255, 255))
-        draw_grid()
-        draw_base(environment["recharge_zone"])
-        obstacles = environment["obstacles"]
-        for (x, y) in obstacles:
-            draw_obs((x,y))
-        draw_robot(turtle)
-        pygame.display.flip()
-
-        step += 1
-        pygame.time.delay(500)
+        if clock.render():
+            if profiler is None:
+                viewer.draw()
+            else:
+                t0 = profiler.now()
+                viewer.draw()
+                profiler.record("draw", profiler.now() - t0)
+            events.LOG.flush()              # events of the cycles since the last frame, in one write
 
-        
-        if turtle.get_battery() <= 0:
+        if simulation.done:
             running = False
+        clock.wait()
 
-    pygame.quit() # pylint: disable=no-member
+    events.LOG.flush()
+    if profiler is not None:
+        profiler.dump(args.profile)
+        print(profiler.report())
+    viewer.close()
     sys.exit()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,139 @@
+'''
+Incremental replanning (D* Lite)
+'''
+import heapq
+
+INF = float("inf")
+
+
+class DStarLite:
+    '''
+    D* Lite (Koenig & Likhachev) : the search runs from the goal toward the robot and its state (g / rhs values,
+    priority queue) is kept between two calls. When obstacles change, only the cells around the changes
+    are updated and the search is repaired instead of being done again from scratch.
+    Same stateful engine contract as HierarchicalPlanner : route(start, goal) returns the cells of the path.
+    '''
+
+    def __init__(self, grid):
+        self.grid = grid
+        self.goal = None
+        self.expanded = 0           # total number of expansions (first search + repairs)
+
+    def __repr__(self):
+        return f"<DStarLite goal={self.goal} expanded={self.expanded}>"
+
+    def _reset(self, start, goal):
+        self.goal = goal
+        self.version = self.grid.version
+        self.km = 0
+        self.last = start
+        self.g = {}
+        self.rhs = {self.grid.index(*goal): 0}
+        self.open = {}              # cell -> key currently valid in the heap
+        self.heap = []
+        self._push(self.grid.index(*goal), start)
+
+    def _h(self, i, start):
+        y, x = divmod(i, self.grid.width)
+        return abs(x - start[0]) + abs(y - start[1])
+
+    def _key(self, i, start):
+        m = min(self.g.get(i, INF), self.rhs.get(i, INF))
+        return (m + self._h(i, start) + self.km, m)
+
+    def _push(self, i, start):
+        key = self._key(i, start)
+        self.open[i] = key
+        heapq.heappush(self.heap, (key, i))
+
+    def _top(self):
+        """
+        Smallest valid entry of the heap (stale entries are dropped)
+        """
+        while self.heap:
+            key, i = self.heap[0]
+            if self.open.get(i) == key:
+                return key, i
+            heapq.heappop(self.heap)
+        return (INF, INF), None
+
+    def _update(self, i, start):
+        """
+        Recompute rhs(i) from its neighbours and put i in the queue if it is inconsistent
+        """
+        grid = self.grid
+        if i != grid.index(*self.goal):
+            if grid.cells[i]:
+                self.rhs[i] = INF
+            else:
+                g = self.g
+                best = INF
+                for j in grid.neighbours(i):
+                    if not grid.cells[j]:
+                        best = min(best, g.get(j, INF) + 1)
+                self.rhs[i] = best
+        self.open.pop(i, None)
+        if self.g.get(i, INF) != self.rhs.get(i, INF):
+            self._push(i, start)
+
+    def _compute(self, start):
+        grid = self.grid
+        s = grid.index(*start)
+        g, rhs = self.g, self.rhs
+        while True:
+            key, u = self._top()
+            if u is None or (key >= self._key(s, start) and rhs.get(s, INF) == g.get(s, INF)):
+                return
+            new_key = self._key(u, start)
+            if key < new_key:
+                self._push(u, start)
+                continue
+            heapq.heappop(self.heap)
+            del self.open[u]
+            self.expanded += 1
+            if g.get(u, INF) > rhs.get(u, INF):
+                g[u] = rhs[u]
+                for j in grid.neighbours(u):
+                    self._update(j, start)
+            else:
+                g[u] = INF
+                self._update(u, start)
+                for j in grid.neighbours(u):
+                    self._update(j, start)
+
+    def route(self, start, goal):
+        """
+        Cells from start (excluded) to goal (included), None if the goal can't be reached
+        """
+        grid = self.grid
+        if start == goal:
+            return []
+        if not grid.is_free(*goal) or not grid.is_free(*start):
+            return None
+        changed = None if goal != self.goal else grid.changes_since(self.version)
+        if changed is None:
+            self._reset(start, goal)
+        elif changed:
+            # the robot moved since the last repair : keys are shifted by km instead of being recomputed
+            self.km += abs(start[0] - self.last[0]) + abs(start[1] - self.last[1])
+            self.last = start
+            for i in set(changed):
+                self._update(i, start)
+                for j in grid.neighbours(i):
+                    self._update(j, start)
+            self.version = grid.version
+        self._compute(start)
+
+        # Follow the smallest g from the robot to the goal
+        g = self.g
+        i = grid.index(*start)
+        t = grid.index(*goal)
+        if g.get(i, INF) == INF:
+            return None
+        path = []
+        while i != t:
+            i = min((j for j in grid.neighbours(i) if not grid.cells[j]), key=lambda j: g.get(j, INF), default=None)
+            if i is None or g.get(i, INF) == INF:
+                return None
+            path.append(grid.cell(i))
+        return path
@@ -0,0 +1,140 @@
+'''
+Distance field toward a fixed goal
+'''
+from collections import deque
+import numpy as np
+
+UNREACHABLE = -1
+
+class DistanceField:
+    '''
+    Reverse BFS from the goal : distance to the goal and next cell to take from every reachable cell.
+    Built once for a (goal, grid version) pair, then each query is a single array read.
+    '''
+
+    def __init__(self, goal, grid):
+        self.goal = goal
+        self.grid = grid
+        self.version = grid.version                                         # obstacles used to build the field
+        self.distance = np.full(grid.width*grid.height, UNREACHABLE, dtype=np.int32)  # moves to the goal
+        self.next_hop = np.full(grid.width*grid.height, UNREACHABLE, dtype=np.int32)  # flat index of the next cell
+        self._distance = memoryview(self.distance)                          # flat views : plain int reads per query
+        self._next_hop = memoryview(self.next_hop)
+        self._blocked = set()                                               # cells turned into obstacles since the build
+        self._checked = self.version                                        # grid version read into _blocked
+        self._build()
+
+    def __repr__(self):
+        return f"<DistanceField goal={self.goal} version={self.version}>"
+
+    def _build(self):
+        """
+        BFS starting from the goal, each reached cell points to the cell it was reached from
+        """
+        grid = self.grid
+        width, height = grid.width, grid.height
+        gx, gy = self.goal
+        # Goal outside the map or on an obstacle -- nothing can reach it (same as the forward search)
+        if not grid.is_free(gx, gy):
+            return
+
+        cells = grid.cells
+        distance = self._distance
+        next_hop = self._next_hop
+        last = width*height - width
+        goal = grid.index(gx, gy)
+        distance[goal] = 0
+        queue = deque([goal])
+        while queue:
+            i = queue.popleft()
+            d = distance[i] + 1
+            x = i % width
+            # right, left, down, up
+            for j, ok in ((i+1, x < width-1), (i-1, x > 0), (i+width, i < last), (i-width, i >= width)):
+                if ok and not cells[j] and distance[j] == UNREACHABLE:
+                    distance[j] = d
+                    next_hop[j] = i
+                    queue.append(j)
+
+    def is_valid(self, grid):
+        """
+        True if the field was built on this grid with its current obstacles
+        """
+        return grid is self.grid and grid.version == self.version
+
+    def cost(self, pos):
+        """
+        Number of moves to the goal, None if the goal can't be reached from pos
+        """
+        x, y = pos
+        grid = self.grid
+        if not (0 <= x < grid.width and 0 <= y < grid.height):
+            return None
+        d = self._distance[y*grid.width + x]
+        return None if d == UNREACHABLE else d
+
+    def next_step(self, pos):
+        """
+        Next cell toward the goal, None if the goal can't be reached from pos
+        """
+        x, y = pos
+        grid = self.grid
+        if not (0 <= x < grid.width and 0 <= y < grid.height):
+            return None
+        j = self._next_hop[y*grid.width + x]
+        return None if j == UNREACHABLE else (j % grid.width, j // grid.width)
+
+    def bound(self, pos):
+        """
+        Obstacles changed since the build : number of moves along the path of this field from pos
+        if none of its cells became an obstacle (an upper bound of the distance on the current grid),
+        None if the path is cut or the changes are no longer in the grid journal
+        """
+        grid = self.grid
+        changed = grid.changes_since(self._checked)
+        if changed is None:
+            return None
+        cells = grid.cells
+        for i in changed:                                   # follow the journal, like LidarTable.update
+            if cells[i]:
+                self._blocked.add(i)
+            else:
+                self._blocked.discard(i)
+        self._checked = grid.version
+        d = self.cost(pos)
+        if d is None:
+            return None
+        distance, next_hop = self._distance, self._next_hop
+        if not any(0 <= distance[i] <= d for i in self._blocked):  # no new obstacle closer to the goal than pos
+            return d
+        i = pos[1]*grid.width + pos[0]
+        while True:
+            if i in self._blocked:
+                return None
+            if distance[i] == 0:
+                return d
+            i = next_hop[i]
+
+    def path(self, pos, limit=None):
+        """
+        Cells from pos (excluded) to the goal (included), at most limit cells, None if the goal can't be reached
+        """
+        x, y = pos
+        if not self.grid.in_bounds(x, y):
+            return None
+        width = self.grid.width
+        i = y*width + x
+        distance, next_hop = self._distance, self._next_hop
+        if distance[i] == UNREACHABLE:
+            return None
+        cells = []
+        while distance[i] > 0 and (limit is None or len(cells) < limit):
+            i = next_hop[i]
+            cells.append((i % width, i // width))
+        return cells
+
+
+if __name__ == "__main__":
+    from ..world.grid import Grid
+    field = DistanceField((4, 5), Grid((10, 10), {(2, 3), (5, 5), (5, 8), (4, 9)}))
+    print(field, field.next_step((0, 0)), field.cost((0, 0)))
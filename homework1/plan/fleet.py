@@ -0,0 +1,162 @@
+'''
+Batched planner for a fleet of robots
+'''
+import numpy as np
+from ..world.grid import get_grid
+from ..action.action import MOVE_COST
+from .field import DistanceField
+
+# last instruction of each robot (Plan._instruction[-1])
+MOVE = 0
+RETURN = 1
+CHARGE = 2
+
+# find_next_cell moves for each orientation (0, 90, 180, 270) : front, left, right, back
+_MOVES = np.array([
+    [(1, 0), (0, -1), (0, 1), (-1, 0)],
+    [(0, -1), (-1, 0), (1, 0), (0, 1)],
+    [(-1, 0), (0, 1), (0, -1), (1, 0)],
+    [(0, 1), (1, 0), (-1, 0), (0, -1)],
+])
+
+
+class FleetPlan:
+    '''
+    Same rules as Plan.decide (greedy explorer, return-cost policy, random goals after the exploration)
+    for many robots sharing one map and one recharge zone, decided with array operations.
+    - per-robot state lives in arrays : visited bitmaps (packed, 1 bit per cell), goal, last instruction
+    - robots going to the same cell (recharge zone, goal) read one shared distance field
+    - random goals are drawn from a pool of goal_pool cells connected to the recharge zone so that fields are shared
+    Given the same goals, every robot moves like Plan(search="field") (tests/test_fleet.py) : the other engines
+    can break the ties between shortest paths differently
+    '''
+
+    def __init__(self, robots, environment, size=None, goal_pool=32, seed=None):
+        self.robots = robots                                    # list of Robot, or None if size is given
+        self.size = len(robots) if robots is not None else size
+        self._env = environment
+        self._grid = get_grid(environment)
+        cells = self._grid.width*self._grid.height
+        self.low_battery_threshold = 20
+        self.safety_margin = 5
+        self.exploration_target = 80                            # % explored before going to random goals
+        self._rng = np.random.default_rng(seed)
+        self._fields = {}                                                       # goal (flat index) -> DistanceField
+        # goals connected to the recharge zone only : a goal in a closed area could never be reached
+        xr, yr = environment["recharge_zone"]
+        reachable = np.flatnonzero(self.get_field(self._grid.index(xr, yr)).distance >= 0)
+        self.goal_pool = self._rng.choice(reachable, size=min(goal_pool, len(reachable)), replace=False)
+        self.visited = np.zeros((self.size, -(-cells // 8)), dtype=np.uint8)    # Plan._visited of each robot, 1 bit / cell
+        self.visited_count = np.zeros(self.size, dtype=np.int64)
+        self.goal = self._rng.choice(self.goal_pool, size=self.size)            # Plan._goal (flat index)
+        self.instruction = np.full(self.size, MOVE, dtype=np.uint8)             # Plan._instruction[-1]
+
+    def __repr__(self):
+        return f"<FleetPlan robots={self.size} fields={len(self._fields)}>"
+
+    def get_field(self, goal):
+        """
+        Distance field shared by every robot going to goal (flat index)
+        """
+        field = self._fields.get(goal)
+        if field is None or not field.is_valid(self._grid):
+            field = DistanceField(self._grid.cell(goal), self._grid)
+            self._fields[goal] = field
+        return field
+
+    def is_visited(self, k, idx):
+        """
+        Visited bit of cell idx for robot k (arrays)
+        """
+        return (self.visited[k, idx >> 3] >> (idx & 7)) & 1 == 1
+
+    def decide_arrays(self, x, y, orientation, battery, front, left, right):
+        """
+        One decision per robot from arrays of perceptions
+        Returns (charge, tx, ty, amount, orientation) :
+        charge[k] True -> ("recharge", amount[k]), else ("move_to", (tx[k], ty[k])) ; orientation is updated
+        """
+        grid = self._grid
+        width, height = grid.width, grid.height
+        k = np.arange(self.size)
+        x, y = np.asarray(x), np.asarray(y)
+        battery = np.asarray(battery, dtype=float)
+        idx = y*width + x
+
+        # visited cells and exploration rate
+        new = ~self.is_visited(k, idx) & (grid.occupancy.reshape(-1)[idx] == 0)
+        self.visited[k, idx >> 3] |= (1 << (idx & 7)).astype(np.uint8)
+        self.visited_count += new
+        exploration = self.visited_count/max(grid.free_count, 1)*100
+
+        # 1. low battery : go to the recharge zone / charge
+        xr, yr = self._env["recharge_zone"]
+        base = grid.index(xr, yr)
+        field = self.get_field(base)
+        moves = field.distance[idx]
+        need = np.where(moves >= 0, battery - moves*MOVE_COST < self.safety_margin,
+                        battery < self.low_battery_threshold)
+        going_back = need | (self.instruction == RETURN)
+        at_base = idx == base
+        to_base = going_back & ~at_base
+        charge = (going_back & at_base) | (~going_back & (self.instruction == CHARGE) & (battery < 100))
+        target = np.where(to_base, field.next_hop[idx], idx)
+        target = np.where(target < 0, idx, target)
+
+        # 2. exploration : find_next_cell on every robot
+        orientation = np.asarray(orientation).copy()
+        o = (orientation // 90) % 4
+        cand = _MOVES[o]                                        # (n, 4, 2) front, left, right, back
+        cx = x[:, None] + cand[:, :, 0]
+        cy = y[:, None] + cand[:, :, 1]
+        inside = (cx >= 0) & (cx < width) & (cy >= 0) & (cy < height)
+        cidx = np.where(inside, cy*width + cx, 0)
+        seen = inside & self.is_visited(k[:, None], cidx)
+        f, l, r = np.asarray(front) == 1.0, np.asarray(left) == 1.0, np.asarray(right) == 1.0
+        choice = np.select(
+            [f & ~seen[:, 0], l & ~seen[:, 1], r & ~seen[:, 2], f, r, l],
+            [0, 1, 2, 0, 2, 1], default=3)
+        exploring = ~going_back & ~charge & (exploration < self.exploration_target)
+        turn = np.select([choice == 1, choice == 2], [90, -90], default=0)
+        orientation = np.where(exploring, (orientation + turn) % 360, orientation)
+        target = np.where(exploring, cy[k, choice]*width + cx[k, choice], target)
+
+        # 3. end of the exploration : random goals, one shared field per goal
+        roaming = ~going_back & ~charge & ~exploring
+        if roaming.any():
+            occupancy = grid.occupancy.reshape(-1)
+            renew = roaming & ((idx == self.goal) | (occupancy[self.goal] != 0))
+            self.goal[renew] = self._rng.choice(self.goal_pool, size=int(renew.sum()))
+            stuck = np.zeros(self.size, dtype=bool)
+            for goal in np.unique(self.goal[roaming]):
+                sel = roaming & (self.goal == goal)
+                hop = self.get_field(int(goal)).next_hop[idx[sel]]
+                target[sel] = np.where(hop < 0, idx[sel], hop)
+                stuck[sel] = (hop < 0) & (idx[sel] != goal)
+            # no path to the goal (robot cut off from it) : stay, a new goal is used on the next tick (Plan.no_path)
+            self.goal[stuck] = self._rng.choice(self.goal_pool, size=int(stuck.sum()))
+
+        self.instruction = np.where(charge, CHARGE, np.where(to_base, RETURN, MOVE)).astype(np.uint8)
+        tx, ty = target % width, target // width
+        amount = np.where(charge, 100 - battery, 0.0)
+        return charge, tx, ty, amount, orientation
+
+    def decide_many(self, perceptions):
+        """
+        Plan.decide for every robot : perceptions[k] is the perception dict of self.robots[k],
+        returns the list of instructions of each robot (robots orientations are updated like find_next_cell does)
+        """
+        pos = np.array([p["position"] for p in perceptions])
+        orientation = np.array([robot._orientation for robot in self.robots])
+        charge, tx, ty, amount, orientation = self.decide_arrays(
+            pos[:, 0], pos[:, 1], orientation,
+            [p["battery"] for p in perceptions],
+            [p["lidar_front"] for p in perceptions],
+            [p["lidar_left"] for p in perceptions],
+            [p["lidar_right"] for p in perceptions])
+        decisions = []
+        for robot, c, x, y, a, o in zip(self.robots, charge.tolist(), tx.tolist(), ty.tolist(),
+                                        amount.tolist(), orientation.tolist()):
+            robot._orientation = o
+            decisions.append([("recharge", a)] if c else [("move_to", (x, y))])
+        return decisions
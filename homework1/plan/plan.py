@@ -2,7 +2,22 @@
 Planner interface
 '''
 import random
-from collections import deque
+from collections import OrderedDict, deque
+import numpy as np
+from ..world.grid import get_grid
+from ..action.action import MOVE_COST
+from ..events.events import DEBUG, get_log
+from .field import DistanceField
+from .search import ENGINES as SEARCH_ENGINES
+from .hpa import HierarchicalPlanner
+from .dstar import DStarLite
+
+# Engines keeping a state between two calls : built once on the grid, route(start, goal) returns the next cells
+STATEFUL_ENGINES = {
+    "hpa": HierarchicalPlanner,
+    "dstar": DStarLite,
+}
+FIELD = "field"         # every goal routed with a cached distance field, like the recharge zone (same moves as FleetPlan)
 
 class Plan:
     '''
@@ -13,7 +28,10 @@ class Plan:
     Algorithms for pathfinding or decision-making.
     '''
 
-    def __init__(self, robot, environnement):
+    PERCEPTION = ("battery", "position", "lidar_front", "lidar_left", "lidar_right")   # fields read by decide
+
+    def __init__(self, robot, environnement, search="astar", explorer="greedy", return_policy="cost", log=None,
+                 history=16, macro=False):
         self._action = {
             "move_to": (0.0, 0.0),        # move to point (x, y)
             "recharge":0.0,             # wait until battery is full
@@ -27,14 +45,42 @@ class Plan:
             "exploration" : 2.0,        # second
             "finding_objects" : 5.0     # last
         }
-        self._instruction = [self._action["move_to"]]          # list of instructions / used as memory of actions
-        self.low_battery_threshold = 20                        # when the robot go recharge
+        # last decisions / used as memory of actions (only [-1] is read : ring buffer of history entries, None = unbounded)
+        if history is not None and history < 1:
+            raise ValueError(f"Invalid history {history}, expected None or at least 1 decision")
+        self._instruction = deque([self._action["move_to"]], maxlen=history)
+        self.low_battery_threshold = 20                        # when the robot go recharge (threshold policy / no path to the base)
+        if return_policy not in ("cost", "threshold"):
+            raise ValueError(f"Unknown return policy {return_policy}, expected 'cost' or 'threshold'")
+        self.return_policy = return_policy                     # cost : battery left after the way back / threshold : fixed %
+        self.safety_margin = 5                                 # battery (%) kept when arriving at the base (cost policy)
         self._start_pos = (0.0, 0.0)                           # starting position
         self._env = environnement                              # for the map size / the recharge zone / obstacles (at the end of the exploration part)
-        self._width, self._height = self._env["map_size"]
-        self._visited = set()                                  # visited area
-        self._goal = (random.randint(0,self._width-1),random.randint(0,self._height-1)) # random goal positions at the end of the exploration
+        self._grid = get_grid(environnement)                   # shared occupancy grid (obstacles / visited area / recharge zone)
+        self._width, self._height = self._grid.width, self._grid.height
+        self._goal = None                                      # random goal position at the end of the exploration (new_goal)
+        self._goal_cells = None                                # ((grid version, connected), flat indices) new_goal draws from
+        self._fields = {}                                      # goal -> DistanceField (cache, rebuilt when the grid version changes)
+        self.field_cache_size = 4                              # max number of cached fields
+        if search not in SEARCH_ENGINES and search not in STATEFUL_ENGINES and search != FIELD:
+            raise ValueError(f"Unknown search engine {search}, expected one of {list(SEARCH_ENGINES) + list(STATEFUL_ENGINES) + [FIELD]}")
+        self.search = search                                   # engine used for the other goals (see search.py / hpa.py / dstar.py, FIELD)
+        self._engine = None                                    # instance of the stateful engine, built on first use
+        if explorer not in ("greedy", "frontier"):
+            raise ValueError(f"Unknown explorer {explorer}, expected 'greedy' or 'frontier'")
+        self.explorer = explorer                               # greedy : look at the 3 cells around / frontier : nearest frontier cell
+        self._frontier_route = deque()                         # remaining steps toward the frontier cell targeted
+        self._frontier_pos = None
+        self._paths = OrderedDict()                            # (start, goal, grid version) -> full path (LRU)
+        self.path_cache_size = 64                              # max number of cached paths / 0 = replan every tick
+        self._route = deque()                                  # remaining steps of the path being followed
+        self._route_goal = None
+        self._route_pos = None                                 # where the robot should be before the next step
+        self._route_version = None
+        self.macro = macro                                     # routes sent whole to Action.follow_path (one cycle per route)
+        self._followed = None                                  # last path sent to follow_path, its cells are marked on the next decide
         self.robot = robot
+        self.log = get_log(log)                                # events.EventLog (shared log of the package by default)
 
     def __repr__(self):
         return f"<next={self._instruction}>"
@@ -48,31 +94,70 @@ class Plan:
         battery = perception["battery"]
         xr, yr = self._env["recharge_zone"]
 
-        # Add the actual pos to the visited cases
-        self._visited.add((x, y))
-        exploration = len(self._visited)/(self._width*self._height - len(self._env["obstacles"]))*100       # exploration rate
-        print(f"Exploration : {exploration}%")
+        # Add the actual pos to the visited cases (and the cells crossed by the last follow_path)
+        if self._followed is not None:
+            self.mark_followed(x, y)
+        self._grid.mark_visited(x, y)
+        exploration = self._grid.exploration_rate()       # exploration rate (kept incrementally by the grid)
+        if self.log.level <= DEBUG:
+            self.log.emit(DEBUG, "plan.exploration", "Exploration : %s%%", exploration)
         # --- 1. Low battery ? go to recharge base ---
-        if battery < self.low_battery_threshold and (x,y)!=(xr,yr): # still not on the base
-            self._instruction.append("move")
+        going_back = self._instruction[-1] == "return" or self.need_recharge((x, y), battery)
+        if going_back and (x,y)!=(xr,yr):                                # still not on the base
+            self._instruction.append("return")
+            if self.macro:
+                return self.follow((x,y), (xr, yr), battery, stop_for_recharge=False)
             return self.go_recharge((x,y), (xr, yr))
-        elif battery < self.low_battery_threshold and (x,y)==(xr,yr):   # start recharging
+        elif going_back and (x,y)==(xr,yr):                              # start recharging
             self._instruction.append("charge")
             return self.recharge(perception)
         elif self._instruction[-1]=="charge" and battery<100:           # charge not finished -- continue recharging
             self._instruction.append("charge")
             return self.recharge(perception)
 
-        # --- 2. Find somewhere to go ---
-        next_cell = self.find_next_cell(x, y, perception)
-        if next_cell and exploration<80:  # exploration
+        # --- 2. Find somewhere to go (only while exploring : no wavefront / no turn toward unknown cells after) ---
+        next_cell = None
+        if exploration<80:
+            if self.explorer == "frontier":
+                next_cell = self.find_frontier_cell(x, y)
+            else:
+                next_cell = self.find_next_cell(x, y, perception)
+        if next_cell:                     # exploration
             self._instruction.append("move")
             return [("move_to", next_cell)]
         else:                             # and of the ex^ploration part -- random positions to go
             self._instruction.append("move")
-            if (x,y)==self._goal or (x, y) in self._env["obstacles"]:   # if at goal -- generate new goal
-                self._goal = (random.randint(0,9),random.randint(0,9))
-            return self.go_recharge((x,y), self._goal)                  # find a path to the new goal
+            if self._goal is None or (x,y)==self._goal or not self._grid.is_free(*self._goal):   # if at goal (or goal on an obstacle) -- generate new goal
+                self._goal = self.new_goal((x,y))
+            goal = self._goal if self._goal is not None else (xr, yr)   # nowhere else to go : back to the base
+            if self.macro:
+                return self.follow((x,y), goal, battery)
+            return self.go_recharge((x,y), goal)                        # find a path to the new goal
+
+    def return_cost(self, pos):
+        """
+        Battery needed to reach the recharge zone from pos (distance field x cost of a move), None if no path
+        """
+        moves = self.get_field(self._env["recharge_zone"]).cost(pos)
+        return None if moves is None else moves*MOVE_COST
+
+    def need_recharge(self, pos, battery):
+        """
+        cost policy : go back when the battery left after the way back falls under the safety margin
+        threshold policy (or no way back known) : go back under low_battery_threshold
+        After obstacle changes the old field is kept while its way back is still open and the battery
+        stays above the margin on it : the field is only built again when the answer can change
+        """
+        if self.return_policy == "cost":
+            field = self._fields.get(self._env["recharge_zone"])
+            if field is not None and field.grid is self._grid and not field.is_valid(self._grid):
+                moves = field.bound(pos)
+                if moves is not None and battery - moves*MOVE_COST >= self.safety_margin:
+                    return False
+            cost = self.return_cost(pos)
+            if cost is not None:
+                return battery - cost < self.safety_margin
+        return battery < self.low_battery_threshold
 
     def find_next_cell(self, x, y, perception):
         """
@@ -110,12 +195,13 @@ class Plan:
             move_back = (x, y-1)
 
         # Always prefer to go somewhere unknown
-        if front == 1.0 and move_front not in self._visited: # nothing in front and not visited
+        visited = self._grid.is_visited
+        if front == 1.0 and not visited(*move_front): # nothing in front and not visited
             move = move_front
-        elif left == 1.0 and move_left not in self._visited: # something or visited in front, turn left if left not visited and no obstacle
+        elif left == 1.0 and not visited(*move_left): # something or visited in front, turn left if left not visited and no obstacle
             move = move_left
             self.robot._orientation = (self.robot._orientation + 90) % 360
-        elif right == 1.0 and move_right not in self._visited: # something or visited in front and left, turn right if right not visited and no obstacle 
+        elif right == 1.0 and not visited(*move_right): # something or visited in front and left, turn right if right not visited and no obstacle 
             move = move_right
             self.robot._orientation = (self.robot._orientation - 90) % 360
         elif front == 1.0:  # if all around visited but nothing in front go straight
@@ -131,6 +217,42 @@ class Plan:
         return move
 
 
+    def find_frontier_cell(self, x, y):
+        """
+        Frontier-based exploration : next step toward the nearest frontier cell
+        (free cell never visited, next to a visited one), found with a wavefront (BFS) from the robot.
+        The route is kept while its target is still a frontier cell. None when nothing is left to explore.
+        """
+        grid = self._grid
+        frontier = grid.frontier
+        if self._frontier_route and self._frontier_pos == (x, y):
+            target = self._frontier_route[-1]
+            if grid.index(*target) in frontier and all(grid.is_free(cx, cy) for cx, cy in self._frontier_route):
+                self._frontier_pos = self._frontier_route.popleft()
+                return self._frontier_pos
+
+        # Wavefront from the robot over the free cells, stops on the first frontier cell reached
+        cells = grid.cells
+        start = grid.index(x, y)
+        parent = {start: None}
+        queue = deque([start])
+        while queue:
+            i = queue.popleft()
+            if i in frontier:
+                route = deque()
+                while i != start:
+                    route.appendleft(grid.cell(i))
+                    i = parent[i]
+                self._frontier_route = route
+                self._frontier_pos = route.popleft()
+                return self._frontier_pos
+            for j in grid.neighbours(i):
+                if not cells[j] and j not in parent:
+                    parent[j] = i
+                    queue.append(j)
+        self._frontier_route.clear()
+        return None
+
     def explore(self):
         """
         Random exploration -- not used anymore
@@ -142,50 +264,193 @@ class Plan:
         return [(action, duration)]
 
 
+    def get_field(self, goal):
+        """
+        Distance field toward goal, built once and reused until the obstacles change
+        """
+        field = self._fields.get(goal)
+        if field is None or not field.is_valid(self._grid):
+            field = DistanceField(goal, self._grid)
+            self._fields.pop(goal, None)
+            if len(self._fields) >= self.field_cache_size:    # drop the oldest field
+                del self._fields[next(iter(self._fields))]
+            self._fields[goal] = field
+        return field
+
+    def new_goal(self, pos):
+        """
+        Random free cell the robot can reach from pos (other than pos), None if there is none
+        The cells connected to the recharge zone are read from its distance field : a goal in a closed area
+        could never be reached and would be searched again every tick.
+        Robot cut off from the base : the cells of its own area (one BFS from pos, kept until the obstacles change)
+        """
+        field = self.get_field(self._env["recharge_zone"])
+        key = (self._grid.version, field.cost(pos) is not None)
+        if self._goal_cells is None or self._goal_cells[0] != key:
+            if not key[1]:
+                field = DistanceField(pos, self._grid)
+            self._goal_cells = (key, np.flatnonzero(field.distance >= 0))
+        cells = self._goal_cells[1]
+        goal = pos
+        while goal == pos:
+            if len(cells) <= 1:
+                return None
+            goal = self._grid.cell(int(cells[random.randrange(len(cells))]))
+        return goal
+
+    def get_path(self, start, goal):
+        """
+        Full path from start to goal (start excluded), computed once and kept in a bounded LRU
+        keyed by (start, goal, grid version)
+        """
+        key = (start, goal, self._grid.version)
+        path = self._paths.get(key)
+        if path is not None:
+            self._paths.move_to_end(key)
+            return path
+        path = SEARCH_ENGINES[self.search](start, goal, self._grid)
+        if path is not None:
+            self._paths[key] = path
+            if len(self._paths) > self.path_cache_size:    # drop the least recently used path
+                self._paths.popitem(last=False)
+        return path
+
+    def get_engine(self):
+        """
+        Stateful engine selected with self.search, built on first use and kept between decide calls
+        """
+        if self._engine is None:
+            self._engine = STATEFUL_ENGINES[self.search](self._grid)
+        return self._engine
+
+    def next_on_route(self, start, goal):
+        """
+        Next step of the path being followed, None if it has to be replanned :
+        other goal, robot not where expected, or a cell of the remaining path became an obstacle
+        """
+        if not self._route or self._route_goal != goal or self._route_pos != start:
+            return None
+        if self._route_version != self._grid.version:
+            if not all(self._grid.is_free(cx, cy) for cx, cy in self._route):
+                return None
+            self._route_version = self._grid.version
+        self._route_pos = self._route.popleft()
+        return self._route_pos
+
     def go_recharge(self, current_pos, goal):
         """
         Compute the shortest path to the goal while do run over obstacles
+        The recharge zone never moves : its next step is read from a cached distance field (every goal with search="field")
+        Other goals use the search engine selected with self.search, the path is kept and followed step by step
         """
-        width, height = self._env["map_size"]
-        obstacles = self._env.get("obstacles", set())
         start = current_pos
 
         # Si déjà sur place
         if start == goal:
-            print(f"Already at {goal}")
+            if self.log.level <= DEBUG:
+                self.log.emit(DEBUG, "plan.path", "Already at %s", goal)
             return [("move_to", goal)]
 
-        # --- BFS (Breadth-First Search) to find the shortest path ---
-        queue = deque([(start, [])])
-        visited = {start}
+        if goal == self._env["recharge_zone"] or self.search == FIELD:
+            next_step = self.get_field(goal).next_step(start)
+            if next_step is not None:
+                if self.log.level <= DEBUG:
+                    self.log.emit(DEBUG, "plan.path", "%s vers %s (objectif %s)", start, next_step, goal)
+                return [("move_to", next_step)]
+            return self.no_path(goal, current_pos)
 
-        while queue:
-            (x, y), path = queue.popleft()
+        # --- Path memory : keep following the path computed on a previous tick ---
+        if self.path_cache_size > 0:
+            next_step = self.next_on_route(start, goal)
+            if next_step is not None:
+                if self.log.level <= DEBUG:
+                    self.log.emit(DEBUG, "plan.path", "%s vers %s (objectif %s)", start, next_step, goal)
+                return [("move_to", next_step)]
 
-            # Directions : right, left, up, down
-            for dx, dy in [(1,0), (-1,0), (0,1), (0,-1)]:
-                nx, ny = x + dx, y + dy
-                next_pos = (nx, ny)
+        # --- Search engine (A* by default) to find the shortest path ---
+        if self.search in STATEFUL_ENGINES:   # only the next part of the path (ex: HPA* first segment)
+            path = self.get_engine().route(start, goal)
+        elif self.path_cache_size > 0:
+            path = self.get_path(start, goal)
+        else:
+            path = SEARCH_ENGINES[self.search](start, goal, self._grid)
+        if path:
+            self._route = deque(path)
+            self._route_goal = goal
+            self._route_version = self._grid.version
+            self._route_pos = self._route.popleft()
+            next_step = self._route_pos
+            if self.log.level <= DEBUG:
+                self.log.emit(DEBUG, "plan.path", "%s vers %s (objectif %s)", start, next_step, goal)
+            return [("move_to", next_step)]
 
-                # Limits of the grid and obstacles
-                if (0 <= nx < width and 0 <= ny < height
-                    and next_pos not in obstacles
-                    and next_pos not in visited):
+        # if no path found -- not supposed to arrive
+        return self.no_path(goal, current_pos)
 
-                    # If destination found
-                    if next_pos == goal:
-                        full_path = path + [next_pos]
-                        next_step = full_path[0] if full_path else goal
-                        print(f"{start} vers {next_step} (objectif {goal})")
-                        return [("move_to", next_step)]
+    def no_path(self, goal, current_pos):
+        """
+        No path toward goal : the robot stays where it is. A random goal out of reach is dropped,
+        a new one is drawn on the next decide (instead of searching the same goal again every tick)
+        """
+        if goal == self._goal:
+            self._goal = None
+        self.log.warning("plan.no_path", "Aucun chemin trouvé vers %s, robot reste sur %s", goal, current_pos)
+        return [("move_to", current_pos)]
 
+    def full_path(self, start, goal):
+        """
+        Whole path from start (excluded) to goal with the engine used by go_recharge, None if no path
+        (the stateful engines only give their next part of the path, ex: HPA* first segment)
+        """
+        if goal == self._env["recharge_zone"] or self.search == FIELD:
+            return self.get_field(goal).path(start)
+        if self.search in STATEFUL_ENGINES:
+            return self.get_engine().route(start, goal)
+        if self.path_cache_size > 0:
+            return self.get_path(start, goal)
+        return SEARCH_ENGINES[self.search](start, goal, self._grid)
 
-                    queue.append((next_pos,path + [next_pos]))
-                    visited.add(next_pos)
+    def trim_path(self, path, battery):
+        """
+        Part of the path the step by step planner would follow : it stops on the first cell where the
+        battery left after the moves asks to go recharge (that cell included)
+        """
+        for k, cell in enumerate(path):
+            battery -= MOVE_COST
+            if self.need_recharge(cell, battery):
+                return path[:k+1]
+        return path
 
-        # if no path found -- not supposed to arrive
-        print(f"Aucun chemin trouvé vers {goal}, robot reste sur {current_pos}")
-        return [("move_to", current_pos)]
+    def follow(self, start, goal, battery, stop_for_recharge=True):
+        """
+        Macro instruction : the whole path toward goal in one follow_path (same cells as go_recharge tick after tick)
+        """
+        if start == goal:
+            return self.go_recharge(start, goal)
+        path = self.full_path(start, goal)
+        if not path:                                        # same answer as go_recharge, without searching twice
+            return self.no_path(goal, start)
+        self._route.clear()                                 # the step by step route memory is not used
+        if stop_for_recharge:
+            path = self.trim_path(path, battery)
+        if self.log.level <= DEBUG:
+            self.log.emit(DEBUG, "plan.path", "%s vers %s en %s cases (objectif %s)", start, path[-1], len(path), goal)
+        self._followed = list(path)
+        return [("follow_path", self._followed)]
+
+    def mark_followed(self, x, y):
+        """
+        Mark visited the cells of the last follow_path the robot went through : the path up to its position (x, y)
+        (Action stops early on an obstacle or a low battery)
+        """
+        path, self._followed = self._followed, None
+        try:
+            end = path.index((x, y))
+        except ValueError:                                  # the robot didn't move along the path
+            return
+        mark = self._grid.mark_visited
+        for cx, cy in path[:end]:
+            mark(cx, cy)
 
     # send the recharge instruction
     def recharge(self, perception):
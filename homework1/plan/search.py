@@ -0,0 +1,227 @@
+'''
+Search engines used by the planner
+Every engine has the same contract : engine(start, goal, grid, stats=None)
+and returns the list of cells from start (excluded) to goal (included), or None if there is no path
+(goal on an obstacle or outside the map, start outside the map).
+Internally the engines work on flat cell indices (see world.grid.Grid).
+'''
+import heapq
+from collections import deque
+
+
+def neighbours(i, width, last):
+    """
+    Flat indices of the 4 neighbours (right, left, down, up) that are inside the map
+    last = width*height - width
+    """
+    x = i % width
+    if x < width-1:
+        yield i+1
+    if x > 0:
+        yield i-1
+    if i < last:
+        yield i+width
+    if i >= width:
+        yield i-width
+
+
+def reconstruct(parent, start, goal, grid):
+    """
+    Walk the parent pointers back from the goal
+    """
+    path = []
+    i = goal
+    while i != start:
+        path.append(grid.cell(i))
+        i = parent[i]
+    path.reverse()
+    return path
+
+
+def bfs(start, goal, grid, stats=None):
+    """
+    Breadth-First Search with parent pointers (one dict entry per reached cell, no path copies)
+    """
+    if start == goal:
+        return []
+    if not grid.is_free(*goal) or not grid.in_bounds(*start):
+        if stats is not None:
+            stats["expanded"] = 0
+        return None
+    width, cells = grid.width, grid.cells
+    last = width*grid.height - width
+    s, g = grid.index(*start), grid.index(*goal)
+    parent = {s: None}
+    queue = deque([s])
+    expanded = 0
+    path = None
+    while queue:
+        i = queue.popleft()
+        expanded += 1
+        for j in neighbours(i, width, last):
+            if not cells[j] and j not in parent:
+                parent[j] = i
+                if j == g:
+                    path = reconstruct(parent, s, g, grid)
+                    queue.clear()
+                    break
+                queue.append(j)
+    if stats is not None:
+        stats["expanded"] = expanded
+    return path
+
+
+def astar(start, goal, grid, stats=None):
+    """
+    A* with the Manhattan distance (admissible on a 4-connected grid), binary heap and parent pointers
+    Ties on f are broken toward the cell closest to the goal
+    """
+    if start == goal:
+        return []
+    if not grid.is_free(*goal) or not grid.in_bounds(*start):
+        if stats is not None:
+            stats["expanded"] = 0
+        return None
+    width, cells = grid.width, grid.cells
+    last = width*grid.height - width
+    gx, gy = goal
+    s, t = grid.index(*start), grid.index(gx, gy)
+
+    g = {s: 0}
+    parent = {s: None}
+    h = abs(start[0] - gx) + abs(start[1] - gy)
+    heap = [(h, h, s)]
+    expanded = 0
+    path = None
+    while heap:
+        f, h, i = heapq.heappop(heap)
+        if i == t:
+            path = reconstruct(parent, s, t, grid)
+            break
+        cost = g[i]
+        if cost + h < f:        # stale entry, the cell was pushed again with a lower cost
+            continue
+        expanded += 1
+        cost += 1
+        for j in neighbours(i, width, last):
+            if not cells[j] and cost < g.get(j, cost + 1):
+                g[j] = cost
+                parent[j] = i
+                y, x = divmod(j, width)
+                h = abs(x - gx) + abs(y - gy)
+                heapq.heappush(heap, (cost + h, h, j))
+    if stats is not None:
+        stats["expanded"] = expanded
+    return path
+
+
+def jps(start, goal, grid, stats=None):
+    """
+    Jump Point Search for a 4-connected uniform-cost grid (A* over jump points, Manhattan heuristic)
+    Canonical order : vertical moves first, then horizontal ones.
+    - moving vertically, the robot can go on or turn left/right : a cell is a jump point
+      if a horizontal jump from it finds something
+    - moving horizontally, it only goes on, unless the cell above/below behind it is blocked
+      and the one above/below is free (forced neighbour)
+    Returns the same path length as BFS / A*, "expanded" counts the jump points expanded.
+    """
+    if start == goal:
+        return []
+    if not grid.is_free(*goal) or not grid.in_bounds(*start):
+        if stats is not None:
+            stats["expanded"] = 0
+        return None
+    width, height, cells = grid.width, grid.height, grid.cells
+    gx, gy = goal
+    t = grid.index(gx, gy)
+
+    def jump_h(x, y, dx):
+        """x of the next jump point on the row, None if the row is blocked first"""
+        row = y*width
+        up, down = row - width, row + width
+        while True:
+            x += dx
+            if not 0 <= x < width or cells[row+x]:
+                return None
+            if row+x == t:
+                return x
+            if y > 0 and not cells[up+x] and cells[up+x-dx]:
+                return x
+            if y < height-1 and not cells[down+x] and cells[down+x-dx]:
+                return x
+
+    def jump_v(x, y, dy):
+        """y of the next jump point on the column, None if the column is blocked first"""
+        while True:
+            y += dy
+            if not 0 <= y < height or cells[y*width+x]:
+                return None
+            if y*width+x == t or jump_h(x, y, 1) is not None or jump_h(x, y, -1) is not None:
+                return y
+
+    s = grid.index(*start)
+    g = {s: 0}
+    parent = {s: None}
+    arrival = {s: None}                   # direction used to reach each jump point
+    h = abs(start[0] - gx) + abs(start[1] - gy)
+    heap = [(h, h, s)]
+    expanded = 0
+    path = None
+    while heap:
+        f, h, i = heapq.heappop(heap)
+        if i == t:
+            path = []
+            while i != s:                 # fill the straight segments between jump points
+                j = parent[i]
+                y, x = divmod(i, width)
+                py, px = divmod(j, width)
+                sx, sy = (px > x) - (px < x), (py > y) - (py < y)
+                while (x, y) != (px, py):
+                    path.append((x, y))
+                    x, y = x + sx, y + sy
+                i = j
+            path.reverse()
+            break
+        cost = g[i]
+        if cost + h < f:                  # stale entry
+            continue
+        expanded += 1
+        y, x = divmod(i, width)
+        d = arrival[i]
+        if d is None:
+            directions = [(1,0), (-1,0), (0,1), (0,-1)]
+        elif d[1] != 0:                   # vertical : go on or turn
+            directions = [d, (1,0), (-1,0)]
+        else:                             # horizontal : go on + forced neighbours
+            directions = [d]
+            bx = x - d[0]
+            for sy in (-1, 1):
+                if 0 <= y+sy < height and not cells[(y+sy)*width+x] and cells[(y+sy)*width+bx]:
+                    directions.append((0, sy))
+        for dx, dy in directions:
+            if dy == 0:
+                nx, ny = jump_h(x, y, dx), y
+                if nx is None:
+                    continue
+            else:
+                nx, ny = x, jump_v(x, y, dy)
+                if ny is None:
+                    continue
+            j = ny*width + nx
+            new_cost = cost + abs(nx - x) + abs(ny - y)
+            if new_cost < g.get(j, new_cost + 1):
+                g[j] = new_cost
+                parent[j] = i
+                arrival[j] = (dx, dy)
+                h = abs(nx - gx) + abs(ny - gy)
+                heapq.heappush(heap, (new_cost + h, h, j))
+    if stats is not None:
+        stats["expanded"] = expanded
+    return path
+
+
+ENGINES = {
+    "bfs": bfs,
+    "astar": astar,
+    "jps": jps,
+}
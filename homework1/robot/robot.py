@@ -2,6 +2,7 @@
 Physical robot interface
 '''
 from ..sense import sense as s
+from ..events import events
 
 class Robot:
     '''
@@ -13,68 +14,81 @@ class Robot:
     Methods to initialize the robot and manage its state.
     '''
 
+    __slots__ = ("_name", "_height", "_lenght", "_weight", "_battery", "_x", "_y", "_orientation",
+                 "_wheels", "_distances")          # no __dict__ : fixed fields, ~4x less memory per robot
+
     def __init__(self, name : str): 
         self._name = name
         self._height = 0.1                      # ex : 50x50x10cm robot -- w=1.5kg
         self._lenght = 0.5
         self._weight = 1.5
         self._battery = 100.0
-        self._pos = {
-            "x" : 0,
-            "y" : 0
-        }
+        self._x = 0                             # position (cell)
+        self._y = 0
         self._orientation = 0
-        self._wheels = {                        # from 0 to 100% speed of the wheels
-            "front_right" : 0.0,
-            "front_left" : 0.0,
-        }
-        self._sensors = {
-            "distance_array" : [0.0, 0.0, 0.0],    # left, center right
-            #"bumper" : 0,                          # ex : turtlebot 
-            #"image" : None,                        # camera
-            #"depth_sensor" : None,                 # infra-rouge par ex 
-        }
+        self._wheels = [0.0, 0.0]               # front_right, front_left : from 0 to 100% speed of the wheels
+        self._distances = [0.0, 0.0, 0.0]       # distance_array : left, center right
+        #bumper, image (camera), depth_sensor (infra-rouge par ex) -> not used yet
 
     def __repr__(self):
-        return f"I am {self._name}, reading {self._sensors}"
+        return f"I am {self._name}, reading {self.get_sensors()}"
 
 
     def get_battery(self):
         '''get battery state '''
         return self._battery
 
+    def get_pos(self) -> tuple[int, int]:
+        '''get position (x, y) '''
+        return self._x, self._y
+
+    def get_orientation(self) -> int:
+        '''get orientation (0, 90, 180, 270 degrees) '''
+        return self._orientation
+
     def get_wheels(self):
         '''get wheels state '''
-        return self._wheels
+        return {"front_right" : self._wheels[0], "front_left" : self._wheels[1]}
 
     def get_sensors(self):
         '''get sensors values '''
-        return self._sensors
+        return {"distance_array" : self._distances}
 
     def set_battery(self, value : int):
         '''set battery state '''
         self._battery = value
         return self._battery
 
+    def set_pos(self, x : int, y : int):
+        '''set position '''
+        self._x = x
+        self._y = y
+        return self._x, self._y
+
+    def set_orientation(self, value : int):
+        '''set orientation '''
+        self._orientation = value
+        return self._orientation
+
     def set_wheels(self, tab : float):
         '''set wheels speed '''
-        self._wheels["front_right"]=tab[0]
-        self._wheels["front_left"]=tab[1]
-        return self._wheels
+        self._wheels[0]=tab[0]
+        self._wheels[1]=tab[1]
+        return self.get_wheels()
     
     def set_sensors(self, sensors : s.Sensor):
         '''set sensors'''
         for sens in sensors:
             if sens.get_type() == "Lidar":
                 if sens.get_name().find("0") !=-1:
-                    self._sensors["distance_array"][0] = sens.get_value()
+                    self._distances[0] = sens.get_value()
                 elif sens.get_name().find("1") != -1:
-                    self._sensors["distance_array"][1] = sens.get_value()
+                    self._distances[1] = sens.get_value()
                 elif sens.get_name().find("2") != -1:
-                    self._sensors["distance_array"][2] = sens.get_value()
+                    self._distances[2] = sens.get_value()
             else : 
-                print("Mauvais capteur")
-        return self._sensors
+                events.LOG.warning("robot.sensor", "Mauvais capteur %s", sens.get_name())
+        return self.get_sensors()
 
 
 if __name__ == "__main__":
@@ -2,17 +2,33 @@
 Sensor interface
 '''
 import random 
+import numpy as np
+from ..world.grid import get_grid
+from ..events import events
+
+# front, left, right cells of the lidars for each orientation (same as Sense.perceive)
+LIDAR_OFFSETS = (((1, 0), (0, -1), (0, 1)),        # 0   ->
+                 ((0, -1), (-1, 0), (1, 0)),        # 90  go down
+                 ((-1, 0), (0, 1), (0, -1)),        # 180 <-
+                 ((0, 1), (1, 0), (-1, 0)))         # 270 go up
+# lidar table entry (bit 0 front, bit 1 left, bit 2 right, 1 = free) -> (front, left, right) values
+LIDAR_VALUES = tuple((float(c & 1), float(c >> 1 & 1), float(c >> 2 & 1)) for c in range(8))
 
 class Sensor:
     '''
     How is defined a sensor -- name / type / range / value
     '''
 
-    def __init__(self, name : str, stype : str):
+    __slots__ = ("_name", "_type", "_range", "_value", "_rate", "_stamp")
+
+    def __init__(self, name : str, stype : str, rate : float = None):
         self._name = name
         self._type = stype
-        self._range = [0.0, 0.0]  #tuple min, tuple max --> polar coordinates more than 1 limit -- à voir
+        self._range = (0.0, 0.0)  #tuple min, tuple max --> polar coordinates more than 1 limit -- à voir
         self._value = None       # type image or tab or single value
+        self._rate = None        # polls per second, None : every cycle
+        self._stamp = None       # time of the last value
+        self.set_rate(rate)
 
     def __repr__(self):
         return f"I am {self._name}, a {self._type} reading {self._value}"
@@ -28,6 +44,18 @@ class Sensor:
     
     def get_range(self): 
         return self._range
+
+    def get_rate(self):
+        return self._rate
+
+    def get_stamp(self):
+        return self._stamp
+
+    def set_rate(self, rate : float):
+        if rate is not None and not rate > 0:
+            raise ValueError(f"Invalid rate {rate}, expected None or a number of polls per second > 0")
+        self._rate = rate
+        return self._rate
     
     def set_value(self, value : float):
         if value >= self._range[0] and value <= self._range[1]: 
@@ -36,8 +64,7 @@ class Sensor:
     
     def set_range(self, values : list):
         if len(values)==2:
-            self._range[0] = min(values)
-            self._range[1] = max(values)
+            self._range = (min(values), max(values))
         return self._range
     
     def collect_data(self, robot=None, environment=None):
@@ -66,20 +93,127 @@ class Sensor:
             value = robot.get_battery() if robot else 100.0
 
         else:
-            print(f"[WARNING] Sensor {self._type} unknown")
+            events.LOG.warning("sense.unknown", "Sensor %s unknown", self._type)
             value = None
 
         self._value = value
         return self._value
+
+    def read(self, now, robot=None, environment=None):
+        """
+        Value at time now : collected at most rate times per second, else the last value (stamped get_stamp())
+        """
+        if self._stamp is None or self._rate is None or now - self._stamp >= 1.0/self._rate:
+            self.collect_data(robot=robot, environment=environment)
+            self._stamp = now
+        return self._value
     
+class LidarTable:
+    '''
+    Lidars of a map for every (orientation, y, x) : 3 bits per entry in a 4 x height x width uint8 array,
+    a perception is one indexed read. Built once with numpy, kept up to date with the grid change journal
+    (only the cells next to a changed obstacle are recomputed, everything if the journal overflowed).
+    '''
+
+    def __init__(self, grid):
+        self.grid = grid
+        self.build()
+
+    def __repr__(self):
+        return f"<LidarTable {self.grid.width}x{self.grid.height} version={self.version}>"
+
+    def build(self):
+        grid = self.grid
+        free = np.zeros((grid.height+2, grid.width+2), dtype=np.uint8)    # border = out of the map
+        free[1:-1, 1:-1] = grid.occupancy == 0
+        table = np.empty((4, grid.height, grid.width), dtype=np.uint8)
+        for o, cells in enumerate(LIDAR_OFFSETS):
+            code = np.zeros((grid.height, grid.width), dtype=np.uint8)
+            for bit, (dx, dy) in enumerate(cells):
+                code |= free[1+dy:grid.height+1+dy, 1+dx:grid.width+1+dx] << bit
+            table[o] = code
+        self.table = table
+        self.cells = memoryview(table.reshape(-1))          # flat view : [(o*height + y)*width + x]
+        self.version = grid.version
+
+    def code(self, x, y, o):
+        is_free = self.grid.is_free
+        code = 0
+        for bit, (dx, dy) in enumerate(LIDAR_OFFSETS[o]):
+            if is_free(x+dx, y+dy):
+                code |= 1 << bit
+        return code
+
+    def update(self):
+        """
+        Follow the obstacle changes since the last build / update
+        """
+        grid = self.grid
+        changed = grid.changes_since(self.version)
+        if changed is None:
+            self.build()
+            return
+        width, height = grid.width, grid.height
+        for i in set(changed):
+            y, x = divmod(i, width)
+            for nx, ny in ((x+1, y), (x-1, y), (x, y+1), (x, y-1)):
+                if 0 <= nx < width and 0 <= ny < height:
+                    for o in range(4):
+                        self.cells[(o*height + ny)*width + nx] = self.code(nx, ny, o)
+        self.version = grid.version
+
+    def read(self, x, y, orientation):
+        """
+        (front, left, right) lidar values
+        """
+        if self.version != self.grid.version:
+            self.update()
+        grid = self.grid
+        return LIDAR_VALUES[self.cells[((orientation // 90)*grid.height + y)*grid.width + x]]
+
+
+def get_lidar_table(environment):
+    """
+    LidarTable of an environment, built on first use and shared like the grid
+    """
+    table = environment.get("lidar_table")
+    if table is None:
+        table = LidarTable(get_grid(environment))
+        environment["lidar_table"] = table
+    return table
+
+
+# perception field -> raw sensors it needs (lidar_* are read from the map, the random lidar values are not used)
+FIELD_SENSORS = {
+    "battery": ("battery",),
+    "position": (),
+    "obstacle_ahead": ("bumper",),
+    "lidar_front": (),
+    "lidar_left": (),
+    "lidar_right": (),
+}
+
+
 class Sense:
     """ 
     Use of the sensors -- perception of the sensor -- because I used only the lidar and the battery here
     In the real world, the bumper is an emergency stop...
+    lidar="table" reads the lidars from a precomputed LidarTable (static maps) instead of the grid
+    fields : perception fields the planner reads (Plan.PERCEPTION), None = all of them.
+    A sensor no field needs is never polled, a sensor with a rate keeps its last value between two polls :
+    perception["stamps"] gives the time of the values of these sensors (simulated time, dt per cycle).
+    Extra sensors added to self.sensors are read under their own name if it is in fields.
     """
-    def __init__(self, robot, environment):
+    def __init__(self, robot, environment, lidar="grid", fields=None, dt=1.0):
         self.robot = robot
         self.environment = environment
+        self.grid = get_grid(environment)   # shared occupancy grid
+        if lidar not in ("grid", "table"):
+            raise ValueError(f"Unknown lidar mode {lidar}, expected 'grid' or 'table'")
+        self.lidar = lidar
+        self._lidar_table = get_lidar_table(environment) if lidar == "table" else None
+        self.dt = dt                        # seconds per cycle (move_to : 1 sec / case)
+        self.time = 0.0
 
         # Ensemble de capteurs bruts
         self.sensors = {
@@ -89,15 +223,65 @@ class Sense:
             "bumper": Sensor("B1", "bumper"),
             "battery": Sensor("BAT", "battery")
         }
+        self.set_fields(fields)
+
+    def set_fields(self, fields=None):
+        """
+        Choose the perception fields, and so the sensors that are polled
+        """
+        self.fields = tuple(FIELD_SENSORS) if fields is None else tuple(fields)
+        needed = []
+        for field in self.fields:
+            for name in FIELD_SENSORS.get(field, (field,)):
+                if name not in needed:
+                    needed.append(name)
+        self._polled = [(name, self.sensors[name]) for name in needed]
+        self._lidars_used = any(field.startswith("lidar_") or field == "obstacle_ahead" for field in self.fields)
+        self._obstacle_used = "obstacle_ahead" in self.fields
+        self._extra = [field for field in self.fields if field not in FIELD_SENSORS]
+        return self.fields
+
+    def add_sensor(self, name, sensor, read=True):
+        """
+        Plug a new sensor, its value is in the perception under name (if read)
+        """
+        self.sensors[name] = sensor
+        return self.set_fields(self.fields + (name,) if read and name not in self.fields else self.fields)
 
     def perceive(self):
-        perception = {}
-        for name, sensor in self.sensors.items():
-            perception[name] = sensor.collect_data(robot=self.robot, environment=self.environment)
+        self.time += self.dt
+        now = self.time
+        robot, environment = self.robot, self.environment
+        values = {name: sensor.read(now, robot, environment) for name, sensor in self._polled}
 
-        x, y = self.robot._pos["x"], self.robot._pos["y"]
-        width, height = self.environment["map_size"]
+        x, y = robot._x, robot._y
+        # sending infos to plan
+        perception_simple = {"position": (x, y)}
+        if "battery" in values:
+            perception_simple["battery"] = values["battery"]
+
+        if self._lidars_used:
+            if self._lidar_table is not None:
+                front, left, right = self._lidar_table.read(x, y, robot._orientation)
+            else:
+                lidars = self.read_lidars(x, y, {})
+                front, left, right = lidars["front"], lidars["left"], lidars["right"]
+            perception_simple["lidar_front"] = front
+            perception_simple["lidar_left"] = left
+            perception_simple["lidar_right"] = right
+            if self._obstacle_used:
+                perception_simple["obstacle_ahead"] = front == 0.0 or values.get("bumper", False)
+
+        for name in self._extra:
+            perception_simple[name] = values[name]
+        if any(sensor._rate is not None for _, sensor in self._polled):
+            perception_simple["stamps"] = {name: sensor._stamp for name, sensor in self._polled}
+        return perception_simple
 
+    def read_lidars(self, x, y, lidars):
+        """
+        Lidar values from the grid cells around the robot
+        """
         # lidar positions
         front = left = right = (x, y)
         if self.robot._orientation == 0:  # ->
@@ -117,28 +301,11 @@ class Sense:
             left  = (x+1, y)
             right = (x-1, y)
 
-        lidars = {}
-        obstacles = self.environment.get("obstacles", set())  # if the case next to one of the lidar is an obstacle, set lidar to 0.0 (distance to obstacle)
-        lidars["front"] = 0.0 if front in obstacles or front[0] > width-1 or front[0] < 0 or front[1] > width-1 or front[1] < 0 else 1.0
-        lidars["left"]  = 0.0 if left  in obstacles or left[0] > width-1 or left[0] < 0 or left[1] > width-1 or left[1] < 0 else 1.0
-        lidars["right"] = 0.0 if right in obstacles or right[0] > width-1 or right[0] < 0 or right[1] > width-1 or right[1] < 0 else 1.0
-
-        obstacle_ahead = (
-            lidars["front"] == 0.0 or
-            perception.get("bumper", False)
-        )
-        # sending infos to plan
-        perception_simple = {
-            "battery": perception.get("battery", 100),
-            "position": (x, y),
-            "obstacle_ahead": obstacle_ahead,
-            "lidar_front": lidars["front"],
-            "lidar_left": lidars["left"],
-            "lidar_right": lidars["right"]
-        }
-
-        return perception_simple
-
+        is_free = self.grid.is_free  # if the case next to one of the lidar is an obstacle or out of the map, set lidar to 0.0 (distance to obstacle)
+        lidars["front"] = 1.0 if is_free(*front) else 0.0
+        lidars["left"]  = 1.0 if is_free(*left) else 0.0
+        lidars["right"] = 1.0 if is_free(*right) else 0.0
+        return lidars
 
 
 if __name__ == "__main__":
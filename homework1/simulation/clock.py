@@ -0,0 +1,79 @@
+'''
+Clock interface
+'''
+import time
+
+
+class FixedStepClock:
+    '''
+    Fixed simulation timestep and independent, capped render rate
+    - tick() gives the number of SPA cycles due since the last call (sim_rate x speed cycles per wall second),
+      a slow frame only makes the next tick() return more cycles (catch-up), it never slows the simulation
+    - a backlog longer than max_lag seconds is dropped (the machine can't follow this speed)
+    - render() is True at most render_rate times per second
+    '''
+
+    def __init__(self, sim_rate=1000.0, render_rate=30.0, speed=1.0, max_lag=0.25, now=time.perf_counter):
+        self.sim_rate = sim_rate            # SPA cycles per simulated second
+        self.render_rate = render_rate      # frames per wall second (cap)
+        self.speed = speed                  # fast-forward multiplier
+        self.max_lag = max_lag
+        self._now = now
+        self._last = now()
+        self._next_frame = self._last
+        self._acc = 0.0                     # simulated seconds not run yet
+        self.steps = 0
+        self.frames = 0
+        self.dropped = 0                    # cycles dropped because of the lag
+
+    def __repr__(self):
+        return (f"<FixedStepClock {self.sim_rate:g} Hz x{self.speed:g}, {self.render_rate:g} FPS, "
+                f"steps={self.steps} frames={self.frames} dropped={self.dropped}>")
+
+    def faster(self, factor=2.0):
+        self.speed *= factor
+        return self.speed
+
+    def slower(self, factor=2.0):
+        self.speed /= factor
+        return self.speed
+
+    def tick(self):
+        """
+        Number of cycles to run now
+        """
+        now = self._now()
+        self._acc += (now - self._last)*self.speed
+        self._last = now
+        dt = 1.0/self.sim_rate
+        if self._acc > self.max_lag*self.speed:
+            lag = self._acc - self.max_lag*self.speed
+            self.dropped += int(lag/dt)
+            self._acc -= int(lag/dt)*dt
+        steps = int(self._acc/dt)
+        self._acc -= steps*dt
+        self.steps += steps
+        return steps
+
+    def render(self):
+        """
+        True if a frame is due (the next one is planned 1/render_rate later, missed frames are skipped)
+        """
+        now = self._now()
+        if now < self._next_frame:
+            return False
+        self._next_frame += 1.0/self.render_rate
+        if self._next_frame < now:                  # late : skip the missed frames
+            self._next_frame = now + 1.0/self.render_rate
+        self.frames += 1
+        return True
+
+    def wait(self):
+        """
+        Sleep until the next cycle or frame is due
+        """
+        now = self._now()
+        cycle = self._last + (1.0/self.sim_rate - self._acc)/self.speed
+        delay = min(cycle, self._next_frame) - now
+        if delay > 0:
+            time.sleep(delay)
@@ -0,0 +1,100 @@
+'''
+Vectorized simulation of a fleet of robots
+'''
+import numpy as np
+from ..world.grid import get_grid
+from ..plan.fleet import FleetPlan
+from ..action.action import MOVE_COST
+from .simulation import default_environment
+
+# front, left, right offsets for each orientation (0, 90, 180, 270), same as Sense.perceive
+LIDARS = np.array([
+    [(1, 0), (0, -1), (0, 1)],
+    [(0, -1), (-1, 0), (1, 0)],
+    [(-1, 0), (0, 1), (0, -1)],
+    [(0, 1), (1, 0), (-1, 0)],
+])
+# move_forward of Action.move_to for each orientation
+FORWARD = np.array([(1, 0), (0, -1), (-1, 0), (0, 1)])
+
+
+def lidars(grid, x, y, orientation):
+    """
+    lidar_front / left / right of every robot : 1.0 if the next cell is free, 0.0 if obstacle or out of the map
+    """
+    offsets = LIDARS[(orientation // 90) % 4]
+    cx, cy = x[:, None] + offsets[:, :, 0], y[:, None] + offsets[:, :, 1]
+    inside = (cx >= 0) & (cx < grid.width) & (cy >= 0) & (cy < grid.height)
+    free = inside & (grid.occupancy[np.clip(cy, 0, grid.height-1), np.clip(cx, 0, grid.width-1)] == 0)
+    return free[:, 0].astype(float), free[:, 1].astype(float), free[:, 2].astype(float)
+
+
+class FleetSimulation:
+    '''
+    Struct of arrays : x, y, orientation and battery of every robot are numpy arrays and one tick
+    applies Sense.perceive (lidars), FleetPlan and Action.move_to / recharge to all of them at once.
+    Robots with an empty battery don't move anymore (end of the main.py loop for one robot).
+    The random sensors of Sense (lidar values, bumper) are not simulated : the planner doesn't read them.
+    '''
+
+    def __init__(self, n, environment=None, seed=None, positions=None):
+        self.environment = environment if environment is not None else default_environment()
+        self.grid = get_grid(self.environment)
+        self.planner = FleetPlan(None, self.environment, size=n, seed=seed)
+        self.size = n
+        if positions is None:
+            self.x = np.zeros(n, dtype=np.int64)                # Robot starts in (0, 0)
+            self.y = np.zeros(n, dtype=np.int64)
+        else:
+            self.x = np.array([p[0] for p in positions], dtype=np.int64)
+            self.y = np.array([p[1] for p in positions], dtype=np.int64)
+        self.orientation = np.zeros(n, dtype=np.int64)
+        self.battery = np.full(n, 100.0)
+        self.steps = 0
+
+    def __repr__(self):
+        return f"<FleetSimulation robots={self.size} step={self.steps} alive={int(self.alive().sum())}>"
+
+    def alive(self):
+        return self.battery > 0
+
+    def perceive(self):
+        return lidars(self.grid, self.x, self.y, self.orientation)
+
+    def act(self, charge, tx, ty, alive):
+        """
+        Action.move_to (turn toward the target then move forward, clamped to the map) and Action.recharge (+1%)
+        """
+        x, y, o = self.x, self.y, self.orientation
+        dx, dy = tx - x, ty - y
+        desired = np.select([dx > 0, dx < 0, dy > 0, dy < 0], [0, 180, 270, 90], default=o)
+        diff = (desired - o) % 360
+        turned = np.where(diff == 90, (o + 90) % 360, np.where(diff == 270, (o - 90) % 360, desired))
+        forward = FORWARD[turned // 90]
+        nx = np.clip(x + forward[:, 0], 0, self.grid.width-1)
+        ny = np.clip(y + forward[:, 1], 0, self.grid.height-1)
+
+        move = alive & ~charge
+        self.x = np.where(move, nx, x)
+        self.y = np.where(move, ny, y)
+        self.orientation = np.where(move, turned, o)
+        self.battery = np.where(move, np.maximum(0, self.battery - MOVE_COST),
+                                np.where(alive & charge, np.minimum(100, self.battery + 1), self.battery))
+
+    def step(self, n=1):
+        """
+        n ticks of the whole fleet, returns the number of ticks done (stops when every battery is empty)
+        """
+        done = 0
+        while done < n:
+            alive = self.alive()
+            if not alive.any():
+                break
+            front, left, right = self.perceive()
+            charge, tx, ty, _, orientation = self.planner.decide_arrays(
+                self.x, self.y, self.orientation, self.battery, front, left, right)
+            self.orientation = np.where(alive, orientation, self.orientation)
+            self.act(charge, tx, ty, alive)
+            done += 1
+        self.steps += done
+        return done
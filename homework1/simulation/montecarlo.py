@@ -0,0 +1,173 @@
+'''
+Monte Carlo runner : many seeded episodes of the Sense -> Plan -> Act loop over a process pool
+
+From the directory SPA_model :
+    python -m homework1.simulation.montecarlo --episodes 1000 --size 20 --workers 8
+'''
+import argparse
+import os
+import random
+import statistics
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from .simulation import Simulation
+from ..events.events import EventLog, OFF
+
+
+def connected_cells(size, obstacles, start):
+    """
+    Free cells reachable from start on a size x size map (4-connected)
+    """
+    seen = {start}
+    queue = deque([start])
+    while queue:
+        x, y = queue.popleft()
+        for cell in ((x+1, y), (x-1, y), (x, y+1), (x, y-1)):
+            if 0 <= cell[0] < size and 0 <= cell[1] < size and cell not in obstacles and cell not in seen:
+                seen.add(cell)
+                queue.append(cell)
+    return seen
+
+
+def random_environment(size, density, rng):
+    """
+    Square map with random obstacles, the start cell (0, 0) and the recharge zone are free
+    and the recharge zone is reachable from (0, 0) : the robot can always go back to the base
+    (the cells around (0, 0) are cleared when it is closed in)
+    """
+    obstacles = {(x, y) for x in range(size) for y in range(size) if rng.random() < density}
+    obstacles.discard((0, 0))
+    connected = connected_cells(size, obstacles, (0, 0))
+    if len(connected) == 1:
+        obstacles -= {(1, 0), (0, 1)}
+        connected = connected_cells(size, obstacles, (0, 0))
+    free = [(x, y) for x in range(size) for y in range(size) if (x, y) in connected and (x, y) != (0, 0)]
+    return {"map_size": (size, size), "recharge_zone": rng.choice(free), "obstacles": obstacles}
+
+
+def episode(seed, size=10, density=0.1, max_steps=5000, target=80.0, sample_every=100, plan_options=None):
+    """
+    One episode : the seed fixes the map, the recharge zone, the goals and the sensor values
+    Returns a dict : coverage over time, steps to the coverage target, recharge trips, battery death
+    """
+    rng = random.Random(seed)
+    environment = random_environment(size, density, rng)
+    random.seed(seed)                               # Plan goals and Sensor.collect_data use the random module
+    simulation = Simulation(environment, log=EventLog(level=OFF), **(plan_options or {}))
+    planner, grid = simulation.planner, simulation.grid
+    coverage = [(0, grid.exploration_rate())]
+    steps_to_target = None
+    trips = 0
+    while simulation.steps < max_steps and not simulation.done:
+        charging = planner._instruction[-1] == "charge"
+        simulation.step()
+        if planner._instruction[-1] == "charge" and not charging:
+            trips += 1
+        rate = grid.exploration_rate()
+        if steps_to_target is None and rate >= target:
+            steps_to_target = simulation.steps
+        if simulation.steps % sample_every == 0:
+            coverage.append((simulation.steps, rate))
+    if coverage[-1][0] != simulation.steps:
+        coverage.append((simulation.steps, grid.exploration_rate()))
+    return {
+        "seed": seed,
+        "steps": simulation.steps,
+        "coverage": coverage,
+        "steps_to_target": steps_to_target,
+        "recharge_trips": trips,
+        "battery_death": simulation.done,
+        "sample_every": sample_every,
+    }
+
+
+def run(seeds, workers=None, chunksize=None, **options):
+    """
+    Run one episode per seed on a pool of workers (one process per core by default), results in seed order
+    """
+    seeds = list(seeds)
+    workers = workers or os.cpu_count() or 1
+    if chunksize is None:
+        chunksize = max(1, len(seeds) // (workers*8))   # big enough chunks to hide the inter-process calls
+    job = partial(episode, **options)
+    if workers == 1:
+        return [job(seed) for seed in seeds]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(job, seeds, chunksize=chunksize))
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values)-1, int(q/100*len(values)))]
+
+
+def summary(results):
+    """
+    Statistics over the episodes : coverage target reached, steps to reach it, recharge trips, battery deaths,
+    mean coverage at each sampled step (episodes that ended keep their last coverage)
+    """
+    sample_every = min(r["sample_every"] for r in results)    # coverage sampling period of the episodes
+    reached = [r["steps_to_target"] for r in results if r["steps_to_target"] is not None]
+    trips = [r["recharge_trips"] for r in results]
+    horizon = max(r["steps"] for r in results)
+    curve = []
+    for step in range(0, horizon+1, sample_every):
+        rates = []
+        for r in results:
+            rate = r["coverage"][0][1]
+            for s, value in r["coverage"]:
+                if s > step:
+                    break
+                rate = value
+            rates.append(rate)
+        curve.append((step, statistics.fmean(rates)))
+    return {
+        "episodes": len(results),
+        "reached_target": len(reached)/len(results),
+        "steps_to_target": {
+            "mean": statistics.fmean(reached) if reached else None,
+            "p50": percentile(reached, 50) if reached else None,
+            "p90": percentile(reached, 90) if reached else None,
+        },
+        "recharge_trips": {"mean": statistics.fmean(trips), "max": max(trips)},
+        "battery_deaths": sum(r["battery_death"] for r in results),
+        "coverage": curve,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--episodes", type=int, default=200)
+    parser.add_argument("--first-seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None, help="default : one per core")
+    parser.add_argument("--size", type=int, default=10)
+    parser.add_argument("--density", type=float, default=0.1)
+    parser.add_argument("--max-steps", type=int, default=5000)
+    parser.add_argument("--target", type=float, default=80.0, help="coverage target in %%")
+    parser.add_argument("--explorer", default="greedy", choices=["greedy", "frontier"])
+    parser.add_argument("--search", default="astar")
+    args = parser.parse_args()
+
+    options = {"size": args.size, "density": args.density, "max_steps": args.max_steps, "target": args.target,
+               "plan_options": {"explorer": args.explorer, "search": args.search}}
+    t0 = time.perf_counter()
+    results = run(range(args.first_seed, args.first_seed + args.episodes), workers=args.workers, **options)
+    elapsed = time.perf_counter() - t0
+    stats = summary(results)
+    steps = stats["steps_to_target"]
+    print(f"{stats['episodes']} episodes in {elapsed:.1f} s ({stats['episodes']/elapsed:.1f} episodes/s, "
+          f"{sum(r['steps'] for r in results)/elapsed:,.0f} cycles/s)")
+    if steps["mean"] is not None:
+        print(f"{args.target}% coverage reached : {stats['reached_target']:.0%}, steps mean {steps['mean']:.0f} "
+              f"p50 {steps['p50']} p90 {steps['p90']}")
+    else:
+        print(f"{args.target}% coverage never reached")
+    print(f"recharge trips : mean {stats['recharge_trips']['mean']:.2f}, max {stats['recharge_trips']['max']}")
+    print(f"battery deaths : {stats['battery_deaths']}")
+    print("coverage : " + "  ".join(f"{step}:{rate:.0f}%" for step, rate in stats["coverage"][:10]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+'''
+Profiler interface
+
+Time spent in each phase of the SPA cycle (sense / plan / act, draw in main.py), in fixed-memory
+HDR-style histograms : values in ns, log-linear buckets (exact under 2^SUB_BITS ns, then
+2^(SUB_BITS-1) buckets per power of 2 : < 1.6 % error on any percentile), up to 2^MAX_BITS ns (~104 days).
+The hot path only stores the clock reads of each cycle, they are binned with numpy every BATCH cycles.
+Plug it in a simulation with simulation.profiler = PhaseProfiler()
+'''
+import csv
+import json
+import time
+import numpy as np
+
+SUB_BITS = 7
+MAX_BITS = 53               # exact int -> float conversion for the vectorised bit length
+PHASES = ("sense", "plan", "act")
+BATCH = 4096                # cycles kept before binning
+
+
+class Histogram:
+    '''
+    Log-linear histogram of integer values (ns), the memory never grows : 3072 counters
+    '''
+
+    SIZE = ((MAX_BITS - SUB_BITS + 1) << (SUB_BITS - 1)) + (1 << (SUB_BITS - 1))
+
+    def __init__(self):
+        self.counts = np.zeros(self.SIZE, dtype=np.int64)
+        self.total = 0
+        self.max = 0
+
+    def __repr__(self):
+        return f"<Histogram count={self.count} p50={self.percentile(50)} p99={self.percentile(99)} max={self.max}>"
+
+    @property
+    def count(self):
+        return int(self.counts.sum())
+
+    @staticmethod
+    def bucket(value):
+        """
+        Bucket index of a value
+        """
+        value = min(value, (1 << MAX_BITS) - 1)         # saturate (max stays exact)
+        shift = value.bit_length() - SUB_BITS
+        if shift <= 0:
+            return value
+        return (shift << (SUB_BITS - 1)) + (value >> shift)
+
+    @staticmethod
+    def buckets(values):
+        """
+        Bucket indices of an int64 array of values (same as bucket, vectorised)
+        """
+        values = np.minimum(values, (1 << MAX_BITS) - 1)
+        shift = np.maximum(np.frexp(values.astype(np.float64))[1] - SUB_BITS, 0)     # frexp exponent = bit length
+        return np.where(shift > 0, (shift << (SUB_BITS - 1)) + (values >> shift), values)
+
+    @staticmethod
+    def bucket_value(index):
+        """
+        Highest value of a bucket
+        """
+        index = int(index)
+        if index < (1 << SUB_BITS):
+            return index
+        shift = (index >> (SUB_BITS - 1)) - 1
+        mantissa = index - (shift << (SUB_BITS - 1))
+        return ((mantissa + 1) << shift) - 1
+
+    def record(self, value):
+        """
+        Add one value (ns)
+        """
+        self.counts[self.bucket(value)] += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def record_many(self, values):
+        """
+        Add an array of values (ns)
+        """
+        values = np.maximum(np.asarray(values, dtype=np.int64), 0)
+        if not len(values):
+            return
+        self.counts += np.bincount(self.buckets(values), minlength=self.SIZE)
+        self.total += int(values.sum())
+        self.max = max(self.max, int(values.max()))
+
+    def percentile(self, p):
+        """
+        Value under which p % of the recorded values are (0 if empty)
+        """
+        cumulative = np.cumsum(self.counts)
+        count = int(cumulative[-1])
+        if not count:
+            return 0
+        rank = max(1, -(-count*p//100))                 # ceil
+        index = int(np.searchsorted(cumulative, rank))
+        return min(self.bucket_value(index), self.max)
+
+    def mean(self):
+        count = self.count
+        return self.total/count if count else 0.0
+
+    def merge(self, other):
+        self.counts += other.counts
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def reset(self):
+        self.counts[:] = 0
+        self.total = self.max = 0
+
+
+class PhaseProfiler:
+    '''
+    One histogram per phase (+ "cycle", the whole cycle), timed with time.perf_counter_ns (monotonic)
+    - SPA loop : stamp((t0, t1, t2, t3)) per cycle, the clock reads around the phases, binned every BATCH cycles
+    - anything else : t0 = profiler.now() ... profiler.record("draw", profiler.now() - t0)
+    '''
+
+    def __init__(self, phases=PHASES):
+        self.phases = tuple(phases)
+        self.histograms = {name: Histogram() for name in self.phases + ("cycle",)}
+        self.now = time.perf_counter_ns
+        self._stamps = []
+
+    def __repr__(self):
+        return f"<PhaseProfiler {', '.join(f'{name}={h.count}' for name, h in self.histograms.items())}>"
+
+    def histogram(self, phase):
+        """
+        Histogram of a phase, created on first use
+        """
+        histogram = self.histograms.get(phase)
+        if histogram is None:
+            histogram = self.histograms[phase] = Histogram()
+        return histogram
+
+    def record(self, phase, ns):
+        self.histogram(phase).record(ns)
+
+    def stamp(self, stamps):
+        """
+        Clock reads of one cycle : len(phases)+1 values, phase k lasted stamps[k+1] - stamps[k]
+        """
+        self._stamps.append(stamps)
+        if len(self._stamps) >= BATCH:
+            self.collect()
+
+    def collect(self):
+        """
+        Bin the cycles stamped since the last call
+        """
+        if not self._stamps:
+            return
+        stamps = np.array(self._stamps, dtype=np.int64)
+        self._stamps.clear()
+        durations = np.diff(stamps, axis=1)
+        for k, name in enumerate(self.phases):
+            self.histograms[name].record_many(durations[:, k])
+        self.histograms["cycle"].record_many(stamps[:, -1] - stamps[:, 0])
+
+    def summary(self):
+        """
+        {phase: {count, mean, p50, p90, p99, max}} in microseconds, phases never timed are left out
+        """
+        self.collect()
+        summary = {}
+        for name, h in self.histograms.items():
+            if h.count:
+                summary[name] = {"count": h.count, "mean_us": h.mean()/1e3, "p50_us": h.percentile(50)/1e3,
+                                 "p90_us": h.percentile(90)/1e3, "p99_us": h.percentile(99)/1e3, "max_us": h.max/1e3}
+        return summary
+
+    def report(self):
+        """
+        Summary as a text table
+        """
+        lines = [f"{'phase':<8} {'count':>10} {'mean':>9} {'p50':>9} {'p99':>9} {'max':>10}  (us)"]
+        for name, s in self.summary().items():
+            lines.append(f"{name:<8} {s['count']:>10} {s['mean_us']:>9.2f} {s['p50_us']:>9.2f} "
+                         f"{s['p99_us']:>9.2f} {s['max_us']:>10.1f}")
+        return "\n".join(lines)
+
+    def dump(self, path):
+        """
+        Write the summary to path : CSV if it ends with .csv, else JSON (summary + non-empty buckets)
+        """
+        summary = self.summary()
+        if path.lower().endswith(".csv"):
+            with open(path, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(["phase", "count", "mean_us", "p50_us", "p90_us", "p99_us", "max_us"])
+                for name, s in summary.items():
+                    writer.writerow([name] + [s[key] for key in ("count", "mean_us", "p50_us", "p90_us", "p99_us", "max_us")])
+            return summary
+        buckets = {name: [[h.bucket_value(i), int(h.counts[i])] for i in np.flatnonzero(h.counts)]
+                   for name, h in self.histograms.items() if name in summary}
+        with open(path, "w") as f:
+            json.dump({"unit": "us", "phases": summary, "buckets_ns": buckets}, f, indent=1)
+        return summary
+
+    def reset(self):
+        self._stamps.clear()
+        for histogram in self.histograms.values():
+            histogram.reset()
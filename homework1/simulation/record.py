@@ -0,0 +1,230 @@
+'''
+Record / replay of SPA cycles in a binary log
+
+File layout (little endian) :
+    header   : magic "SPAL", version, record size, records per chunk, flags, seed
+    chunks   : (records, bytes) then the records, zlib compressed if FLAG_ZLIB
+    index    : offset of each chunk, then (index offset, chunk count, "SPAI") -- written by close()
+Every record has the same size (RECORD) : step, perception, first instruction of the decision, robot state after it.
+A follow_path instruction is stored as its last cell and its length (the cells in between are not kept) :
+its record is marked "replayable": False, its decision can't be executed again.
+A log without index (run killed before close) is still readable : the chunks are scanned once.
+'''
+import bisect
+import mmap
+import struct
+import zlib
+
+MAGIC = b"SPAL"
+INDEX_MAGIC = b"SPAI"
+VERSION = 1
+FLAG_ZLIB = 1
+
+HEADER = struct.Struct("<4sHHIIq")
+CHUNK = struct.Struct("<II")
+FOOTER = struct.Struct("<QI4s")
+# step | battery, x, y, lidar front / left / right, obstacle_ahead | action, target x, target y, value | x, y, orientation, battery
+RECORD = struct.Struct("<I diifff? Biid iihd")
+
+ACTIONS = ("", "move_to", "recharge", "move_forward", "turn_left", "turn_right", "follow_path")
+ACTION_CODES = {name: code for code, name in enumerate(ACTIONS)}
+
+
+class Recorder:
+    '''
+    Append-only writer : only the current chunk is kept in memory
+    Plug it in a simulation with simulation.recorder = Recorder(path)
+    '''
+
+    def __init__(self, path, compress=True, chunk_records=4096, level=6, seed=None):
+        self.path = path
+        self.compress = compress
+        self.chunk_records = chunk_records
+        self.level = level
+        self._file = open(path, "wb")
+        self._file.write(HEADER.pack(MAGIC, VERSION, RECORD.size, chunk_records,
+                                     FLAG_ZLIB if compress else 0, -1 if seed is None else seed))
+        self._buffer = bytearray()
+        self._pending = 0           # records in the buffer
+        self._offsets = []          # file offset of each chunk
+        self.records = 0
+
+    def __repr__(self):
+        return f"<Recorder {self.path} records={self.records}>"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def write(self, step, perception, decision, robot):
+        """
+        One SPA cycle : perception dict, decision list (its first instruction is kept) and the robot after Action
+        """
+        action, tx, ty, value = 0, 0, 0, 0.0
+        if decision:
+            instr = decision[0]
+            action = ACTION_CODES.get(instr[0], 0)
+            arg = instr[1] if len(instr) > 1 else 0.0
+            if isinstance(arg, tuple):
+                tx, ty = arg
+            elif isinstance(arg, list):                 # follow_path : last cell, number of cells
+                (tx, ty), value = arg[-1] if arg else (0, 0), len(arg)
+            else:
+                value = arg
+        px, py = perception["position"]
+        x, y = robot.get_pos()
+        self._buffer += RECORD.pack(
+            step, perception["battery"], px, py,
+            perception["lidar_front"], perception["lidar_left"], perception["lidar_right"], perception.get("obstacle_ahead", False),
+            action, tx, ty, value,
+            x, y, robot._orientation, robot.get_battery())
+        self._pending += 1
+        self.records += 1
+        if self._pending == self.chunk_records:
+            self.flush()
+
+    def flush(self):
+        """
+        Write the current chunk
+        """
+        if not self._pending:
+            return
+        data = zlib.compress(bytes(self._buffer), self.level) if self.compress else self._buffer
+        self._offsets.append(self._file.tell())
+        self._file.write(CHUNK.pack(self._pending, len(data)))
+        self._file.write(data)
+        self._buffer = bytearray()
+        self._pending = 0
+
+    def close(self):
+        if self._file.closed:
+            return
+        self.flush()
+        index = self._file.tell()
+        self._file.write(struct.pack(f"<{len(self._offsets)}Q", *self._offsets))
+        self._file.write(FOOTER.pack(index, len(self._offsets), INDEX_MAGIC))
+        self._file.close()
+
+
+class Replay:
+    '''
+    Memory-mapped reader : replay[k] decodes only the chunk of record k (the last chunk read is kept)
+    '''
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, size, self.chunk_records, flags, seed = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or size != RECORD.size:
+            raise ValueError(f"{path} is not a SPA log (version {VERSION})")
+        self.compressed = bool(flags & FLAG_ZLIB)
+        self.seed = None if seed < 0 else seed
+        self._chunks = self._read_index()
+        self._cache = (None, None)          # (chunk number, decoded records)
+        # first record of each chunk, from the chunk headers : a flush() before a chunk is full writes a short chunk
+        self._starts = []
+        self._len = 0
+        for offset in self._chunks:
+            self._starts.append(self._len)
+            self._len += CHUNK.unpack_from(self._map, offset)[0]
+
+    def __repr__(self):
+        return f"<Replay {self.path} records={len(self)}>"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _read_index(self):
+        """
+        Chunk offsets from the index, or from a scan of the chunks if the log was not closed
+        """
+        mm = self._map
+        if len(mm) >= HEADER.size + FOOTER.size:
+            index, count, magic = FOOTER.unpack_from(mm, len(mm) - FOOTER.size)
+            if magic == INDEX_MAGIC:
+                return list(struct.unpack_from(f"<{count}Q", mm, index))
+        offsets = []
+        offset = HEADER.size
+        while offset + CHUNK.size <= len(mm):
+            records, nbytes = CHUNK.unpack_from(mm, offset)
+            if records == 0 or offset + CHUNK.size + nbytes > len(mm):
+                break                   # chunk cut by a crash
+            offsets.append(offset)
+            offset += CHUNK.size + nbytes
+        return offsets
+
+    def __len__(self):
+        return self._len
+
+    def _raw(self, k):
+        if not 0 <= k < self._len:
+            raise IndexError(k)
+        c = bisect.bisect_right(self._starts, k) - 1
+        r = k - self._starts[c]
+        offset = self._chunks[c]
+        if not self.compressed:
+            return RECORD.unpack_from(self._map, offset + CHUNK.size + r*RECORD.size)
+        if self._cache[0] != c:
+            _, nbytes = CHUNK.unpack_from(self._map, offset)
+            start = offset + CHUNK.size
+            self._cache = (c, zlib.decompress(self._map[start:start+nbytes]))
+        return RECORD.unpack_from(self._cache[1], r*RECORD.size)
+
+    def __getitem__(self, k):
+        """
+        Record k as dicts : {"step", "perception", "decision", "state", "replayable"}
+        follow_path records : the decision is an empty path, "path" gives the last cell and the length of the path
+        """
+        (step, battery, px, py, front, left, right, obstacle,
+         action, tx, ty, value, x, y, orientation, robot_battery) = self._raw(k)
+        replayable = True
+        if ACTIONS[action] == "move_to":
+            decision = [("move_to", (tx, ty))]
+        elif ACTIONS[action] == "follow_path":                  # only the end of the path is recorded
+            decision = [("follow_path", [])]
+            replayable = False
+        elif action:
+            decision = [(ACTIONS[action], value)]
+        else:
+            decision = []
+        record = {
+            "step": step,
+            "perception": {"battery": battery, "position": (px, py), "obstacle_ahead": obstacle,
+                           "lidar_front": front, "lidar_left": left, "lidar_right": right},
+            "decision": decision,
+            "state": {"position": (x, y), "orientation": orientation, "battery": robot_battery},
+            "replayable": replayable,
+        }
+        if not replayable:
+            record["path"] = {"end": (tx, ty), "length": int(value)}
+        return record
+
+    def __iter__(self):
+        for k in range(self._len):
+            yield self[k]
+
+    def state(self, k):
+        """
+        Robot state after record k
+        """
+        return self[k]["state"]
+
+    def restore(self, k, robot):
+        """
+        Put the robot in its state after record k (no simulation)
+        """
+        state = self.state(k)
+        robot.set_pos(*state["position"])
+        robot.set_orientation(state["orientation"])
+        robot.set_battery(state["battery"])
+        return robot
+
+    def close(self):
+        self._map.close()
+        self._file.close()
@@ -0,0 +1,89 @@
+'''
+Simulation interface
+'''
+from ..robot import robot as r
+from ..sense import sense as s
+from ..plan import plan as p
+from ..action import action as a
+from ..world.grid import get_grid
+from ..events.events import get_log
+
+
+def default_environment():
+    """
+    The 10x10 map of main.py (a new dict each time : the grid is cached inside the environment)
+    """
+    return {"map_size": (10, 10), "recharge_zone": (4, 5), "obstacles": {(2, 3), (5, 5), (5, 8), (4, 9)}}
+
+
+class Simulation:
+    '''
+    Sense -> Plan -> Act loop without display and without sleeps
+    Owns the robot, the sensors, the planner and the actuator. Nothing imports pygame here,
+    so a simulation can be built and stepped inside a worker process (see viewer.Viewer for the display).
+    '''
+
+    def __init__(self, environment=None, robot=None, lidar="grid", log=None, **plan_options):
+        self.log = get_log(log)         # events.EventLog of the planner and the actuator
+        self.environment = environment if environment is not None else default_environment()
+        self.robot = robot if robot is not None else r.Robot("Turtle")
+        self.grid = get_grid(self.environment)
+        self.planner = p.Plan(self.robot, self.environment, log=self.log, **plan_options)
+        # only the sensors the planner reads are polled
+        self.sense = s.Sense(self.robot, self.environment, lidar=lidar, fields=self.planner.PERCEPTION)
+        self.actuator = a.Action(self.robot, self.environment, log=self.log)
+        self.steps = 0                  # SPA cycles done
+        self.perception = None          # last perception / decision (for the viewer, logs...)
+        self.decision = None
+        self.recorder = None            # record.Recorder : every cycle is appended to a binary log
+        self.profiler = None            # profiler.PhaseProfiler : time of sense / plan / act per cycle
+
+    def __repr__(self):
+        return f"<Simulation step={self.steps} battery={self.robot.get_battery():.1f}%>"
+
+    @property
+    def done(self):
+        """
+        Battery empty : the robot can't do anything anymore (end of main.py loop)
+        """
+        return self.robot.get_battery() <= 0
+
+    def step(self, n=1):
+        """
+        Run n SPA cycles (less if the battery gets empty), returns the number of cycles done
+        With a profiler, the clock is read around each phase (one test per phase when there is none)
+        """
+        sense, planner, actuator = self.sense, self.planner, self.actuator
+        profiler = self.profiler
+        now = profiler.now if profiler is not None else None
+        done = 0
+        while done < n and not self.done:
+            if now is not None:
+                t0 = now()
+            self.perception = sense.perceive()
+            if now is not None:
+                t1 = now()
+            self.decision = planner.decide(self.perception)
+            if now is not None:
+                t2 = now()
+            actuator.execute(self.decision)
+            if now is not None:
+                profiler.stamp((t0, t1, t2, now()))
+            done += 1
+            if self.recorder is not None:
+                self.recorder.write(self.steps + done, self.perception, self.decision, self.robot)
+        self.steps += done
+        return done
+
+    def run_until(self, predicate, max_steps=None):
+        """
+        Step until predicate(simulation) is True, the battery is empty or max_steps cycles are done
+        Returns True if the predicate was reached
+        """
+        done = 0
+        while not predicate(self):
+            if self.done or (max_steps is not None and done >= max_steps):
+                return False
+            self.step()
+            done += 1
+        return True
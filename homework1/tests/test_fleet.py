@@ -0,0 +1,111 @@
+'''
+FleetSimulation against one scalar Robot / Sense / Plan / Action per robot on the same seeded maps :
+positions, orientations, batteries and last instructions must be equal after every tick
+
+From the directory SPA_model :
+    python -m pytest homework1/tests
+'''
+import random
+import numpy as np
+import pytest
+from ..robot.robot import Robot
+from ..sense.sense import Sense
+from ..plan.plan import Plan
+from ..plan.fleet import MOVE, RETURN, CHARGE
+from ..action.action import Action
+from ..events.events import EventLog, OFF
+from ..world.grid import get_grid
+from ..simulation.fleet import FleetSimulation
+from ..simulation.montecarlo import random_environment
+
+INSTRUCTIONS = {MOVE: "move", RETURN: "return", CHARGE: "charge"}      # FleetPlan.instruction -> Plan._instruction[-1]
+QUIET = EventLog(level=OFF)
+
+
+def map_copy(environment):
+    """
+    Same map in a new dict : one Grid (so one visited bitmap) per scalar robot, like the per-robot bitmaps of FleetPlan
+    """
+    return {"map_size": environment["map_size"], "recharge_zone": environment["recharge_zone"],
+            "obstacles": set(environment["obstacles"])}
+
+
+def start_positions(environment, n, seed):
+    grid = get_grid(map_copy(environment))
+    free = np.flatnonzero(grid.occupancy.reshape(-1) == 0)
+    return [grid.cell(int(i)) for i in np.random.default_rng(seed).choice(free, size=n)]
+
+
+class ScalarRobot:
+    '''
+    One robot of the fleet run through the scalar classes
+    The random goals of FleetPlan come from its own generator (shared pool of goals) : the planner is given
+    the same goals, everything else is decided by Plan.decide
+    '''
+
+    def __init__(self, environment, position, fleet, k):
+        self.environment = map_copy(environment)
+        self.robot = Robot(f"R{k}")
+        self.robot.set_pos(*position)
+        self.sense = Sense(self.robot, self.environment, fields=Plan.PERCEPTION)
+        self.planner = Plan(self.robot, self.environment, search="field", log=QUIET)
+        self.actuator = Action(self.robot, self.environment, log=QUIET)
+        grid = self.planner._grid
+        fleet_goal = lambda pos=None: grid.cell(int(fleet.planner.goal[k]))
+        self.planner._goal = fleet_goal()
+        self.planner.new_goal = fleet_goal
+
+    def step(self):
+        self.actuator.execute(self.planner.decide(self.sense.perceive()))
+
+    def state(self):
+        robot = self.robot
+        return robot._x, robot._y, robot._orientation, robot.get_battery(), self.planner._instruction[-1]
+
+
+def fleet_state(fleet, k):
+    return (int(fleet.x[k]), int(fleet.y[k]), int(fleet.orientation[k]), float(fleet.battery[k]),
+            INSTRUCTIONS[int(fleet.planner.instruction[k])])
+
+
+@pytest.mark.parametrize("seed, size, density", [(0, 10, 0.1), (1, 12, 0.2), (2, 8, 0.0), (3, 15, 0.15)])
+def test_fleet_matches_scalar_robots(seed, size, density):
+    environment = random_environment(size, density, random.Random(seed))
+    positions = start_positions(environment, 16, seed)
+    fleet = FleetSimulation(len(positions), environment, seed=seed, positions=positions)
+    robots = [ScalarRobot(environment, position, fleet, k) for k, position in enumerate(positions)]
+    roaming = 0
+    for tick in range(1500):
+        alive = fleet.alive().tolist()
+        if not any(alive):
+            break
+        fleet.step()
+        for k, robot in enumerate(robots):
+            if not alive[k]:
+                continue
+            robot.step()
+            assert robot.state() == fleet_state(fleet, k), f"robot {k} at tick {tick}"
+            roaming += robot.planner._grid.exploration_rate() >= fleet.planner.exploration_target
+    assert roaming                          # the random goals part was compared too
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_goals_reachable_on_dense_maps(seed):
+    """
+    30 % of obstacles : closed areas everywhere, no goal is drawn in them and a robot cut off
+    from its goal gets a new one instead of staying on its cell
+    """
+    environment = random_environment(20, 0.3, random.Random(seed))
+    positions = start_positions(environment, 32, seed)
+    fleet = FleetSimulation(len(positions), environment, seed=seed, positions=positions)
+    planner = fleet.planner
+    grid = fleet.grid
+    base = planner.get_field(grid.index(*environment["recharge_zone"]))
+    assert (base.distance[planner.goal_pool] >= 0).all()
+    planner.exploration_target = 0                  # random goals from the first tick
+    for _ in range(200):
+        fleet.step()
+        idx = fleet.y*grid.width + fleet.x
+        roaming = fleet.alive() & (planner.instruction == MOVE)
+        for k in np.flatnonzero(roaming & (base.distance[idx] >= 0)):
+            assert planner.get_field(int(planner.goal[k])).distance[idx[k]] >= 0
@@ -0,0 +1,20 @@
+'''
+Monte Carlo maps : the recharge zone can always be reached from the start cell
+
+From the directory SPA_model :
+    python -m pytest homework1/tests
+'''
+import random
+import pytest
+from ..plan.field import DistanceField
+from ..world.grid import get_grid
+from ..simulation.montecarlo import random_environment
+
+
+@pytest.mark.parametrize("density", [0.1, 0.3, 0.45])
+def test_recharge_zone_reachable_from_the_start(density):
+    for seed in range(50):
+        environment = random_environment(12, density, random.Random(seed))
+        field = DistanceField(environment["recharge_zone"], get_grid(environment))
+        assert environment["recharge_zone"] != (0, 0)
+        assert field.cost((0, 0)) is not None, f"seed {seed}"
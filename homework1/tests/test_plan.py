@@ -0,0 +1,96 @@
+'''
+Plan : random goals after the exploration stay reachable
+
+From the directory SPA_model :
+    python -m pytest homework1/tests
+'''
+import random
+from ..robot.robot import Robot
+from ..plan import plan as p
+from ..plan.field import DistanceField
+from ..events.events import EventLog, OFF
+
+# 3x3 area closed by walls in the corner of the map, the recharge zone is outside
+POCKET = {(3, y) for y in range(4)} | {(x, 3) for x in range(4)}
+
+
+def explored_planner(environment, **options):
+    planner = p.Plan(Robot("R"), environment, log=EventLog(level=OFF), **options)
+    grid = planner._grid
+    grid.visited[grid.occupancy == 0] = 1
+    grid.visited_count = grid.free_count
+    return planner
+
+
+def roam(planner, pos, ticks):
+    """
+    Positions decided tick after tick (the robot is put on the decided cell), battery always full
+    """
+    perception = {"battery": 100.0, "lidar_front": 1.0, "lidar_left": 1.0, "lidar_right": 1.0}
+    positions = []
+    for _ in range(ticks):
+        perception["position"] = pos
+        pos = planner.decide(perception)[0][1]
+        positions.append(pos)
+    return positions
+
+
+def test_goals_connected_to_the_base():
+    random.seed(0)
+    environment = {"map_size": (30, 30), "recharge_zone": (20, 20), "obstacles": set(POCKET)}
+    planner = explored_planner(environment, return_policy="threshold")
+    for _ in range(200):
+        goal = planner.new_goal((10, 10))
+        assert goal != (10, 10) and not (goal[0] < 3 and goal[1] < 3)
+
+
+def test_robot_cut_off_from_the_base(monkeypatch):
+    """
+    Goals are drawn in the robot's own area, a goal out of reach is dropped after one search
+    """
+    random.seed(0)
+    environment = {"map_size": (60, 60), "recharge_zone": (30, 30), "obstacles": set(POCKET)}
+    planner = explored_planner(environment, return_policy="threshold")
+    searches = []
+    astar = p.SEARCH_ENGINES["astar"]
+    monkeypatch.setitem(p.SEARCH_ENGINES, "astar", lambda *args: searches.append(args) or astar(*args))
+    planner._goal = (50, 50)
+    positions = roam(planner, (1, 1), 100)
+    assert all(x < 3 and y < 3 for x, y in positions)
+    assert sum(goal == (50, 50) for _, goal, _ in searches) == 1
+    assert planner._goal is None or (planner._goal[0] < 3 and planner._goal[1] < 3)
+
+
+def test_return_cost_after_obstacle_changes(monkeypatch):
+    """
+    Cost policy with moving obstacles : same answers as a field built on the current grid,
+    and no new field while the battery is far above the margin on the old way back
+    """
+    rng = random.Random(0)
+    environment = {"map_size": (30, 30), "recharge_zone": (5, 5), "obstacles": set(POCKET)}
+    planner = p.Plan(Robot("R"), environment, log=EventLog(level=OFF))
+    grid = planner._grid
+    free = [(x, y) for x in range(30) for y in range(30) if grid.is_free(x, y)]
+    for _ in range(300):
+        x, y = rng.choice(free)
+        if (x, y) == (5, 5):
+            continue
+        grid.set_obstacle(x, y, grid.is_free(x, y))
+        pos, battery = rng.choice(free), rng.uniform(0, 100)
+        if not grid.is_free(*pos):
+            continue
+        moves = DistanceField((5, 5), grid).cost(pos)
+        expected = battery < planner.low_battery_threshold if moves is None else \
+            battery - moves*p.MOVE_COST < planner.safety_margin
+        assert planner.need_recharge(pos, battery) == expected
+
+    builds = []
+    monkeypatch.setattr(p, "DistanceField", lambda *args: builds.append(args) or DistanceField(*args))
+    planner = p.Plan(Robot("R"), {"map_size": (30, 30), "recharge_zone": (5, 5), "obstacles": set(POCKET)},
+                     log=EventLog(level=OFF))
+    grid = planner._grid
+    planner.need_recharge((10, 10), 100.0)
+    for y in range(20, 30):
+        grid.set_obstacle(25, y)                    # far from the way back of (10, 10)
+        assert not planner.need_recharge((10, 10), 100.0)
+    assert len(builds) <= 1
@@ -0,0 +1,50 @@
+'''
+Record / replay log : every record is read back in place, whatever the chunk sizes
+
+From the directory SPA_model :
+    python -m pytest homework1/tests
+'''
+import pytest
+from ..robot.robot import Robot
+from ..simulation.record import Recorder, Replay, FOOTER
+
+
+def write(path, steps, compress, flush_at=()):
+    robot = Robot("R")
+    with Recorder(path, compress=compress, chunk_records=8) as recorder:
+        for step in range(1, steps+1):
+            robot.set_pos(step % 7, step % 5)
+            perception = {"battery": 100.0 - step, "position": robot.get_pos(),
+                          "lidar_front": 1.0, "lidar_left": 0.0, "lidar_right": 1.0}
+            recorder.write(step, perception, [("move_to", (step, step + 1))], robot)
+            if step in flush_at:
+                recorder.flush()            # short chunk
+
+
+@pytest.mark.parametrize("compress", [False, True])
+@pytest.mark.parametrize("flush_at", [(), (5,), (3, 4, 13)])
+def test_records_read_back_in_order(tmp_path, compress, flush_at):
+    path = str(tmp_path / "run.spalog")
+    write(path, 20, compress, flush_at)
+    with Replay(path) as replay:
+        assert len(replay) == 20
+        assert [record["step"] for record in replay] == list(range(1, 21))
+        assert replay[19]["decision"] == [("move_to", (20, 21))]
+        assert replay.state(8)["position"] == (9 % 7, 9 % 5)
+        with pytest.raises(IndexError):
+            replay[20]
+
+
+def test_log_without_index(tmp_path):
+    """
+    Run killed before close() : the chunks are scanned, short ones included
+    """
+    path = str(tmp_path / "run.spalog")
+    write(path, 20, True, (5,))
+    with open(path, "rb") as f:
+        data = f.read()
+    index = FOOTER.unpack_from(data, len(data) - FOOTER.size)[0]
+    with open(path, "wb") as f:
+        f.write(data[:index])               # drop the index and the footer
+    with Replay(path) as replay:
+        assert [record["step"] for record in replay] == list(range(1, 21))
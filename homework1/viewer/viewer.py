@@ -0,0 +1,186 @@
+'''
+Viewer interface
+'''
+import math
+import numpy as np
+
+# Paramètres
+CELL_SIZE = 50
+MAX_WINDOW = (1000, 800)        # the window is never bigger, large maps are zoomed out to fit
+FREE_COLOR = (255, 255, 255)
+OBSTACLE_COLOR = (100, 0, 100)
+BASE_COLOR = (0, 255, 0)
+LINE_COLOR = (200, 200, 200)
+ROBOT_COLOR = (0, 100, 255)
+
+
+class Viewer:
+    '''
+    pygame display of a Simulation (one robot) or a FleetSimulation (arrays of robots),
+    pygame is only imported when a viewer is created
+    - the map (free cells, obstacles, recharge zone, grid lines) is rendered once to a cached Surface,
+      rebuilt only when the obstacles (grid.version), the recharge zone, the zoom or the pan change
+    - each frame restores the cache under the robots of the previous frame, draws the robots
+      and only updates these rectangles on screen
+    - mouse wheel : zoom, arrows : pan, 0 : whole map, + / - : speed of the clock
+    '''
+
+    def __init__(self, simulation, cell_size=CELL_SIZE, caption="SPA Robot Simulation", clock=None,
+                 max_window=MAX_WINDOW):
+        import pygame           # optional dependency : headless runs never import it
+        self.pygame = pygame
+        self.simulation = simulation
+        self.clock = clock                  # FixedStepClock changed with the + / - keys
+        grid = simulation.grid
+        self.fit = min(cell_size, max_window[0]/grid.width, max_window[1]/grid.height)
+        self.cell_size = self.fit           # zoom : pixels per cell (can be < 1 on large maps)
+        self.offset = (0, 0)                # first cell shown (pan)
+        self.width = math.ceil(self.fit*grid.width)
+        self.height = math.ceil(self.fit*grid.height)
+        pygame.init() # pylint: disable=no-member
+        self.screen = pygame.display.set_mode((self.width, self.height))
+        pygame.display.set_caption(caption)
+        self._world = None                  # 1 pixel per cell
+        self._world_key = None
+        self._view = None                   # static layer at the current zoom / pan
+        self._view_key = None
+        self._dirty = []                    # robot rectangles drawn in the last frame
+
+    def __repr__(self):
+        return f"<Viewer {self.width}x{self.height} zoom={self.cell_size:.2f} px/cell offset={self.offset}>"
+
+    def handle_events(self):
+        """
+        False when the window is closed
+        """
+        pygame = self.pygame
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT: # pylint: disable=no-member
+                return False
+            if event.type == pygame.MOUSEWHEEL: # pylint: disable=no-member
+                self.zoom(2.0 if event.y > 0 else 0.5)
+            elif event.type == pygame.KEYDOWN: # pylint: disable=no-member
+                step = max(1, int(min(self.width, self.height)/self.cell_size/10))
+                moves = {pygame.K_LEFT: (-step, 0), pygame.K_RIGHT: (step, 0), # pylint: disable=no-member
+                         pygame.K_UP: (0, -step), pygame.K_DOWN: (0, step)} # pylint: disable=no-member
+                if event.key in moves:
+                    self.pan(*moves[event.key])
+                elif event.key in (pygame.K_0, pygame.K_KP0): # pylint: disable=no-member
+                    self.cell_size, self.offset = self.fit, (0, 0)
+                elif self.clock is not None:
+                    if event.key in (pygame.K_PLUS, pygame.K_EQUALS, pygame.K_KP_PLUS): # pylint: disable=no-member
+                        self.clock.faster()
+                    elif event.key in (pygame.K_MINUS, pygame.K_KP_MINUS): # pylint: disable=no-member
+                        self.clock.slower()
+        return True
+
+    def zoom(self, factor):
+        """
+        Zoom around the center of the window (never less than the whole map)
+        """
+        cx = self.offset[0] + self.width/self.cell_size/2
+        cy = self.offset[1] + self.height/self.cell_size/2
+        self.cell_size = min(max(self.cell_size*factor, self.fit), 4*CELL_SIZE)
+        self.offset = (0, 0)
+        self.pan(int(cx - self.width/self.cell_size/2), int(cy - self.height/self.cell_size/2))
+        return self.cell_size
+
+    def pan(self, dx, dy):
+        grid = self.simulation.grid
+        x = min(max(self.offset[0] + dx, 0), max(0, grid.width - int(self.width/self.cell_size)))
+        y = min(max(self.offset[1] + dy, 0), max(0, grid.height - int(self.height/self.cell_size)))
+        self.offset = (x, y)
+        return self.offset
+
+    def robots(self):
+        """
+        Cells of the robots to draw
+        """
+        simulation = self.simulation
+        if hasattr(simulation, "robot"):
+            return [simulation.robot.get_pos()]
+        return zip(simulation.x.tolist(), simulation.y.tolist())
+
+    def world(self):
+        """
+        The map at 1 pixel per cell, rebuilt when the obstacles or the recharge zone change
+        """
+        grid = self.simulation.grid
+        base = self.simulation.environment["recharge_zone"]
+        key = (grid, grid.version, base)
+        if self._world_key != key:
+            colors = np.empty((grid.width, grid.height, 3), dtype=np.uint8)     # surfarray is indexed [x, y]
+            colors[:] = FREE_COLOR
+            colors[grid.occupancy.T != 0] = OBSTACLE_COLOR
+            colors[base[0], base[1]] = BASE_COLOR
+            self._world = self.pygame.surfarray.make_surface(colors)
+            self._world_key = key
+        return self._world
+
+    def view(self):
+        """
+        Static layer of the window : the visible part of the map scaled to the zoom, with the grid lines
+        """
+        pygame = self.pygame
+        grid = self.simulation.grid
+        world = self.world()
+        key = (self._world_key, self.cell_size, self.offset)
+        if self._view_key == key:
+            return self._view
+        cs = self.cell_size
+        ox, oy = self.offset
+        cols = min(grid.width - ox, math.ceil(self.width/cs))
+        rows = min(grid.height - oy, math.ceil(self.height/cs))
+        view = pygame.Surface((self.width, self.height))
+        view.fill(FREE_COLOR)
+        part = world.subsurface((ox, oy, cols, rows))
+        view.blit(pygame.transform.scale(part, (round(cols*cs), round(rows*cs))), (0, 0))
+        if cs >= 8:                                         # grid lines only when cells are big enough
+            for k in range(cols+1):
+                x = round(k*cs)
+                pygame.draw.line(view, LINE_COLOR, (x, 0), (x, round(rows*cs)))
+            for k in range(rows+1):
+                y = round(k*cs)
+                pygame.draw.line(view, LINE_COLOR, (0, y), (round(cols*cs), y))
+        self._view = view
+        self._view_key = key
+        self._dirty = []
+        return view
+
+    def draw(self):
+        """
+        Redraw the robots (and the whole window if the static layer changed)
+        """
+        pygame = self.pygame
+        screen = self.screen
+        last = self._view
+        view = self.view()
+        full = view is not last                             # new static layer : whole window
+        if full:
+            screen.blit(view, (0, 0))
+        else:
+            for rect in self._dirty:                        # erase the robots of the last frame
+                screen.blit(view, rect, rect)
+        cs = self.cell_size
+        ox, oy = self.offset
+        size = max(1, math.ceil(cs))
+        radius = int(cs//3)
+        rects = []
+        for x, y in self.robots():
+            px, py = round((x - ox)*cs), round((y - oy)*cs)
+            if not (-size < px < self.width and -size < py < self.height):
+                continue
+            rect = pygame.Rect(px, py, size, size)
+            if radius >= 2:
+                pygame.draw.circle(screen, ROBOT_COLOR, rect.center, radius)
+            else:
+                screen.fill(ROBOT_COLOR, rect)
+            rects.append(rect)
+        if full:
+            pygame.display.flip()
+        else:
+            pygame.display.update(self._dirty + rects)
+        self._dirty = rects
+
+    def close(self):
+        self.pygame.quit() # pylint: disable=no-member
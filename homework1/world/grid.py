@@ -0,0 +1,194 @@
+'''
+World model interface
+'''
+from collections import deque
+import numpy as np
+
+FREE = 0
+OBSTACLE = 1
+
+
+class Grid:
+    '''
+    Occupancy grid shared by Sense, Plan and Action
+
+    Arrays are indexed [y, x] (one row per y). Cells can also be addressed by their flat index
+    i = y*width + x, the search engines work on flat indices through memoryviews (fast int reads
+    from Python loops, no numpy scalar boxing).
+    compact : visited cells packed 8 per byte (1 bit per cell instead of 1 byte, slightly slower reads)
+    '''
+
+    def __init__(self, map_size, obstacles=(), recharge_zone=None, occupancy=None, compact=False):
+        self.width, self.height = map_size
+        if occupancy is None:
+            occupancy = np.zeros((self.height, self.width), dtype=np.uint8)
+            for (x, y) in obstacles:
+                if self.in_bounds(x, y):
+                    occupancy[y, x] = OBSTACLE
+        self.occupancy = occupancy                                              # 0 free / 1 obstacle (can be a memory-mapped array)
+        # np.zeros pages are only really allocated when written : unvisited parts of a large map cost nothing
+        self.compact = compact
+        if compact:
+            self.visited = np.zeros((self.height*self.width + 7) // 8, dtype=np.uint8)   # packed, bit i & 7 of byte i >> 3
+        else:
+            self.visited = np.zeros((self.height, self.width), dtype=np.uint8)         # visited bitmap
+        self.recharge = np.zeros((self.height, self.width), dtype=bool)        # recharge zone mask
+        self.recharge_zone = recharge_zone
+        if recharge_zone is not None:
+            self.recharge[recharge_zone[1], recharge_zone[0]] = True
+        self.cells = memoryview(self.occupancy.reshape(-1))                    # flat views
+        self._visited = memoryview(self.visited.reshape(-1))
+        self.version = 0                                                        # +1 each time an obstacle changes
+        self.changes = deque(maxlen=4096)                                       # journal of the last changes (version, flat index)
+        self._free_count = None                                                 # counted on first use (large maps)
+        self.visited_count = 0
+        self.frontier = set()                                                   # free unvisited cells next to a visited one (flat indices)
+
+    @property
+    def free_count(self):
+        '''number of free cells'''
+        if self._free_count is None:
+            self._free_count = int(self.occupancy.size - np.count_nonzero(self.occupancy))
+        return self._free_count
+
+    @free_count.setter
+    def free_count(self, value):
+        self._free_count = value
+
+    def __repr__(self):
+        return f"<Grid {self.width}x{self.height} free={self.free_count} visited={self.visited_count}>"
+
+    @classmethod
+    def from_environment(cls, environment):
+        return cls(environment["map_size"], environment.get("obstacles", ()), environment.get("recharge_zone"),
+                   compact=environment.get("compact_visited", False))
+
+    def index(self, x, y):
+        '''flat index of a cell'''
+        return y*self.width + x
+
+    def cell(self, i):
+        '''(x, y) of a flat index'''
+        y, x = divmod(i, self.width)
+        return (x, y)
+
+    def in_bounds(self, x, y):
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def is_free(self, x, y):
+        '''in the map and not an obstacle'''
+        return 0 <= x < self.width and 0 <= y < self.height and not self.cells[y*self.width + x]
+
+    def is_obstacle(self, x, y):
+        return 0 <= x < self.width and 0 <= y < self.height and self.cells[y*self.width + x] == OBSTACLE
+
+    def visited_at(self, i):
+        '''1 if the flat index i is visited'''
+        if self.compact:
+            return self._visited[i >> 3] >> (i & 7) & 1
+        return self._visited[i]
+
+    def is_visited(self, x, y):
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return False
+        i = y*self.width + x
+        if self.compact:
+            return self._visited[i >> 3] >> (i & 7) & 1 == 1
+        return self._visited[i] == 1
+
+    def visited_mask(self):
+        '''visited cells as a bool array [y, x] (whatever the storage)'''
+        if self.compact:
+            bits = np.unpackbits(self.visited, bitorder="little")[:self.width*self.height]
+            return bits.reshape(self.height, self.width).astype(bool)
+        return self.visited != 0
+
+    def is_recharge(self, x, y):
+        return 0 <= x < self.width and 0 <= y < self.height and bool(self.recharge[y, x])
+
+    def neighbours(self, i):
+        '''flat indices of the 4 neighbours inside the map (right, left, down, up)'''
+        width = self.width
+        x = i % width
+        out = []
+        if x < width-1:
+            out.append(i+1)
+        if x > 0:
+            out.append(i-1)
+        if i < width*(self.height-1):
+            out.append(i+width)
+        if i >= width:
+            out.append(i-width)
+        return out
+
+    def mark_visited(self, x, y):
+        '''mark a free cell as visited, return True if it was not visited yet'''
+        i = y*self.width + x
+        if self.compact:
+            if self._visited[i >> 3] >> (i & 7) & 1 or self.cells[i]:     # visited cells : no method call (every tick)
+                return False
+            self._visited[i >> 3] |= 1 << (i & 7)
+            visited = self.visited_at
+        else:
+            if self._visited[i] or self.cells[i]:
+                return False
+            self._visited[i] = 1
+            visited = self._visited.__getitem__
+        self.visited_count += 1
+        self.frontier.discard(i)
+        for j in self.neighbours(i):
+            if not visited(j) and not self.cells[j]:
+                self.frontier.add(j)
+        return True
+
+    def set_obstacle(self, x, y, blocked=True):
+        '''add (or remove) an obstacle, the exploration counters are kept up to date'''
+        i = y*self.width + x
+        value = OBSTACLE if blocked else FREE
+        if self.cells[i] == value:
+            return
+        self.cells[i] = value
+        self.free_count += -1 if blocked else 1
+        if blocked:
+            self.frontier.discard(i)
+            if self.visited_at(i):
+                if self.compact:
+                    self._visited[i >> 3] &= ~(1 << (i & 7)) & 0xFF
+                else:
+                    self._visited[i] = 0
+                self.visited_count -= 1
+        elif any(self.visited_at(j) for j in self.neighbours(i)):
+            self.frontier.add(i)
+        self.version += 1
+        self.changes.append((self.version, i))
+
+    def changes_since(self, version):
+        '''flat indices changed after version, None if the journal doesn't go back that far (rebuild everything)'''
+        if version == self.version:
+            return []
+        if not self.changes or self.changes[0][0] > version + 1:
+            return None
+        return [i for v, i in self.changes if v > version]
+
+    def exploration_rate(self):
+        '''visited free cells in % -- kept incrementally'''
+        free = self._free_count if self._free_count is not None else self.free_count
+        return self.visited_count/free*100 if free else 100.0
+
+    def obstacles(self):
+        '''list of the obstacle cells (x, y)'''
+        return [(int(x), int(y)) for y, x in np.argwhere(self.occupancy)]
+
+
+def get_grid(environment):
+    """
+    Grid of an environment dict, built on first use and shared by every class using the same dict
+    - every Plan built on the same dict shares the visited cells (one exploration for all its robots) :
+      give each robot its own dict for separate explorations
+    - environment["obstacles"] is only read here : later changes go through grid.set_obstacle
+    """
+    grid = environment.get("grid")
+    if grid is None:
+        grid = Grid.from_environment(environment)
+        environment["grid"] = grid
+    return grid
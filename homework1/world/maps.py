@@ -0,0 +1,144 @@
+'''
+Map files : ASCII, PNG or .npy occupancy grids loaded into an environment dict
+
+- ASCII : one line per row, '#' (or 'X', '1') obstacle, 'R' recharge zone, anything else free
+- PNG : dark pixels (luminance < threshold) are obstacles, the first pure green pixel is the recharge zone
+- .npy : uint8 array [y, x], 0 free / 1 obstacle, memory-mapped (copy-on-write : obstacles can change
+  in the simulation, the file is never written)
+ASCII and PNG maps are converted once to a binary cache next to the file (<file>.npy + <file>.json),
+the following loads memory-map the cache.
+'''
+import json
+import os
+import numpy as np
+from .grid import Grid, FREE, OBSTACLE, get_grid
+
+OBSTACLE_CHARS = b"#X1"
+RECHARGE_CHAR = b"R"
+CACHE_VERSION = 1
+
+
+def environment_from_occupancy(occupancy, recharge_zone=None):
+    """
+    Environment dict around an occupancy array (the grid is built directly, no set of obstacles)
+    """
+    height, width = occupancy.shape
+    if recharge_zone is None:
+        recharge_zone = first_free_cell(occupancy)
+    recharge_zone = (int(recharge_zone[0]), int(recharge_zone[1]))
+    grid = Grid((width, height), recharge_zone=recharge_zone, occupancy=occupancy)
+    return {"map_size": (width, height), "recharge_zone": recharge_zone, "grid": grid}
+
+
+def first_free_cell(occupancy, rows=256):
+    """
+    First free cell in row order, read a few rows at a time (a memory-mapped map is not read entirely)
+    """
+    for y0 in range(0, occupancy.shape[0], rows):
+        free = np.flatnonzero(occupancy[y0:y0+rows].reshape(-1) == FREE)
+        if len(free):
+            y, x = divmod(int(free[0]), occupancy.shape[1])
+            return (x, y0 + y)
+    raise ValueError("the map has no free cell")
+
+
+def parse_ascii(path):
+    """
+    (occupancy, recharge zone) of an ASCII map, all lines must have the same width
+    """
+    with open(path, "rb") as f:
+        data = f.read().replace(b"\r\n", b"\n").rstrip(b"\n")
+    lines = data.split(b"\n")
+    width = len(lines[0])
+    if any(len(line) != width for line in lines):
+        raise ValueError(f"{path} : all the lines must have {width} characters")
+    chars = np.frombuffer(data + b"\n", dtype=np.uint8).reshape(len(lines), width+1)[:, :width]
+    table = np.zeros(256, dtype=np.uint8)
+    table[np.frombuffer(OBSTACLE_CHARS, dtype=np.uint8)] = OBSTACLE
+    occupancy = table[chars]
+    recharge = np.flatnonzero(chars.reshape(-1) == RECHARGE_CHAR[0])
+    zone = None
+    if len(recharge):
+        y, x = divmod(int(recharge[0]), width)
+        zone = (x, y)
+    return occupancy, zone
+
+
+def parse_png(path, threshold=128):
+    """
+    (occupancy, recharge zone) of an image, read with pygame (already a dependency of the viewer)
+    """
+    import pygame               # optional dependency, only for image maps
+    rgb = pygame.surfarray.array3d(pygame.image.load(path)).transpose(1, 0, 2)     # [x, y] -> [y, x]
+    luminance = rgb @ np.array([0.299, 0.587, 0.114])
+    occupancy = (luminance < threshold).astype(np.uint8)
+    green = np.flatnonzero(((rgb[:, :, 0] == 0) & (rgb[:, :, 1] == 255) & (rgb[:, :, 2] == 0)).reshape(-1))
+    zone = None
+    if len(green):
+        y, x = divmod(int(green[0]), rgb.shape[1])
+        zone = (x, y)
+        occupancy[y, x] = FREE
+    return occupancy, zone
+
+
+def cache_paths(path):
+    return path + ".npy", path + ".json"
+
+
+def read_cache(path):
+    """
+    (memory-mapped occupancy, recharge zone) if the cache of path is up to date, else None
+    """
+    data, meta = cache_paths(path)
+    if not (os.path.exists(data) and os.path.exists(meta)):
+        return None
+    with open(meta) as f:
+        info = json.load(f)
+    stat = os.stat(path)
+    if info.get("version") != CACHE_VERSION or info.get("mtime") != stat.st_mtime_ns or info.get("size") != stat.st_size:
+        return None
+    zone = info.get("recharge_zone")
+    return np.load(data, mmap_mode="c"), tuple(zone) if zone else None
+
+
+def write_cache(path, occupancy, zone):
+    data, meta = cache_paths(path)
+    np.save(data, np.ascontiguousarray(occupancy, dtype=np.uint8))
+    stat = os.stat(path)
+    with open(meta, "w") as f:
+        json.dump({"version": CACHE_VERSION, "mtime": stat.st_mtime_ns, "size": stat.st_size,
+                   "recharge_zone": zone}, f)
+
+
+def load_map(path, recharge_zone=None, cache=True, mmap=True):
+    """
+    Environment dict of a map file (.txt / .map ASCII, .png, .npy)
+    recharge_zone overrides the one of the file, default : first free cell
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".npy":
+        occupancy = np.load(path, mmap_mode="c" if mmap else None)
+        if occupancy.dtype != np.uint8 or occupancy.ndim != 2:
+            raise ValueError(f"{path} : expected a 2D uint8 occupancy array, got {occupancy.dtype} {occupancy.shape}")
+        return environment_from_occupancy(occupancy, recharge_zone)
+
+    cached = read_cache(path) if cache else None
+    if cached is not None:
+        occupancy, zone = cached
+    else:
+        if ext == ".png":
+            occupancy, zone = parse_png(path)
+        else:
+            occupancy, zone = parse_ascii(path)
+        if cache:
+            write_cache(path, occupancy, zone)
+            if mmap:
+                occupancy = read_cache(path)[0]
+    return environment_from_occupancy(occupancy, recharge_zone or zone)
+
+
+def save_npy(environment, path):
+    """
+    Save the occupancy of an environment as a .npy map
+    """
+    np.save(path, np.ascontiguousarray(get_grid(environment).occupancy))